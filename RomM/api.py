@@ -1,20 +1,23 @@
 import base64
 import datetime
 import json
-import math
 import os
 import re
+import time
 import zipfile
-from typing import Tuple
+from typing import Any, Callable, Optional
 from urllib.error import HTTPError, URLError
 from urllib.parse import quote
 from urllib.request import Request, urlopen
 
 import platform_maps
+from asset_pipeline import AssetPipeline
 from filesystem import Filesystem
 from imageutils import ImageUtils
+from metrics import Metrics
 from models import Collection, Platform, Rom
 from PIL import Image
+from rom_table import RomTable
 from status import Status, View
 
 
@@ -27,10 +30,15 @@ class API:
     _user_me_endpoint = "api/users/me"
     _user_profile_picture_url = "assets/romm/assets"
 
+    # Max number of ROMs returned by a search
+    _search_limit = 500
+
     def __init__(self):
         self.status = Status()
         self.file_system = Filesystem()
         self.image_utils = ImageUtils()
+        self.asset_pipeline = AssetPipeline()
+        self.metrics = Metrics()
 
         self.host = os.getenv("HOST", "").strip("/")
         self.username = os.getenv("USERNAME", "")
@@ -40,8 +48,8 @@ class API:
         self._include_collections = set(self._getenv_list("INCLUDE_COLLECTIONS"))
         self._exclude_collections = set(self._getenv_list("EXCLUDE_COLLECTIONS"))
         self._collection_type = os.getenv("COLLECTION_TYPE", "collection")
-        self._download_assets = os.getenv("DOWNLOAD_ASSETS", "false") in ("true", "1")
-        self._fullscreen_assets = os.getenv("FULLSCREEN_ASSETS", "false") in (
+        self.download_assets = os.getenv("DOWNLOAD_ASSETS", "false") in ("true", "1")
+        self.fullscreen_assets = os.getenv("FULLSCREEN_ASSETS", "false") in (
             "true",
             "1",
         )
@@ -51,21 +59,18 @@ class API:
             auth_token = base64.b64encode(credentials.encode("utf-8")).decode("utf-8")
             self.headers = {"Authorization": f"Basic {auth_token}"}
 
+    def _record_request(self, name: str, start: float, size: int) -> None:
+        """Record the latency and size of a request started at start."""
+        self.metrics.observe(
+            f"api.{name}.latency", (time.perf_counter() - start) * 1000
+        )
+        self.metrics.count("api.bytes", size)
+
     @staticmethod
     def _getenv_list(key: str) -> list[str]:
         value = os.getenv(key)
         return [item.strip() for item in value.split(",")] if value is not None else []
 
-    @staticmethod
-    def _human_readable_size(size_bytes: int) -> Tuple[float, str]:
-        if size_bytes == 0:
-            return 0, "B"
-        size_name = ("B", "KB", "MB", "GB")
-        i = int(math.floor(math.log(size_bytes, 1024)))
-        p = math.pow(1024, i)
-        s = round(size_bytes / p, 2)
-        return (s, size_name[i])
-
     def _sanitize_filename(self, filename: str) -> str:
         path_parts = os.path.normpath(filename).split(os.sep)
         sanitized_parts = []
@@ -226,6 +231,7 @@ class API:
                 self.status.valid_host = False
                 self.status.valid_credentials = False
                 return
+            start = time.perf_counter()
             response = urlopen(request, timeout=60)  # trunk-ignore(bandit/B310)
         except HTTPError as e:
             print(f"HTTP Error in fetching platforms: {e}")
@@ -243,7 +249,9 @@ class API:
             self.status.valid_credentials = False
             return
 
-        platforms = json.loads(response.read().decode("utf-8"))
+        data = response.read()
+        self._record_request("fetch_platforms", start, len(data))
+        platforms = json.loads(data.decode("utf-8"))
         _platforms: list[Platform] = []
 
         # Get the list of subfolders in the ROMs directory for PM filtering
@@ -333,6 +341,7 @@ class API:
                 self.status.valid_credentials = False
                 return
 
+            start = time.perf_counter()
             collections_response = urlopen(  # trunk-ignore(bandit/B310)
                 collections_request, timeout=60
             )
@@ -353,8 +362,13 @@ class API:
             self.status.valid_credentials = False
             return
 
-        collections = json.loads(collections_response.read().decode("utf-8"))
-        v_collections = json.loads(v_collections_response.read().decode("utf-8"))
+        collections_data = collections_response.read()
+        v_collections_data = v_collections_response.read()
+        self._record_request(
+            "fetch_collections", start, len(collections_data) + len(v_collections_data)
+        )
+        collections = json.loads(collections_data.decode("utf-8"))
+        v_collections = json.loads(v_collections_data.decode("utf-8"))
 
         if isinstance(collections, dict):
             collections = collections["items"]
@@ -418,42 +432,135 @@ class API:
         else:
             return
 
+        # Files may have been copied to the device since the last listing
+        self.file_system.forget_rom_presence()
+
         try:
             request = Request(
                 f"{self.host}/{self._roms_endpoint}?{view}_id={id}&order_by=name&order_dir=asc&limit=10000",
                 headers=self.headers,
             )
         except ValueError:
-            self.status.roms = []
+            self.status.roms = RomTable()
             self.status.valid_host = False
             self.status.valid_credentials = False
             return
         try:
             if request.type not in ("http", "https"):
-                self.status.roms = []
+                self.status.roms = RomTable()
                 self.status.valid_host = False
                 self.status.valid_credentials = False
                 return
+            start = time.perf_counter()
             response = urlopen(request, timeout=1800)  # trunk-ignore(bandit/B310)
         except HTTPError as e:
             if e.code == 403:
-                self.status.roms = []
+                self.status.roms = RomTable()
                 self.status.valid_host = True
                 self.status.valid_credentials = False
                 return
             else:
                 raise
         except URLError:
-            self.status.roms = []
+            self.status.roms = RomTable()
             self.status.valid_host = False
             self.status.valid_credentials = False
             return
 
         # { 'items': list[dict], 'total': number, 'limit': number, 'offset': number }
-        roms = json.loads(response.read().decode("utf-8"))
+        data = response.read()
+        self._record_request("fetch_roms", start, len(data))
+        roms = json.loads(data.decode("utf-8"))
         if isinstance(roms, dict):
             roms = roms["items"]
 
+        _roms = self._filter_supported_roms(roms, view, selected_platform_slug)
+
+        # Rom rows are only built from the payload when they are displayed
+        self.status.roms = RomTable.from_payload(_roms)
+        self.status.valid_host = True
+        self.status.valid_credentials = True
+        self.status.roms_ready.set()
+
+    def search_roms(
+        self, search_term: str, is_current: Callable[[], bool] = lambda: True
+    ) -> Optional[list[dict[str, Any]]]:
+        """Search the ROMs of every platform by name, see search.GlobalSearch.
+
+        Returns the api/roms items supported on this device, or None when the
+        request failed or is_current() turned false while reading the response.
+        """
+        roms = self._request_roms(
+            f"search_term={quote(search_term)}&order_by=name&order_dir=asc&limit={self._search_limit}",
+            is_current,
+        )
+        return self._filter_supported_roms(roms) if roms is not None else None
+
+    def fetch_platform_roms(self, platform: Platform) -> Optional[list[dict[str, Any]]]:
+        """Return the api/roms items of a platform, without touching status.roms."""
+        roms = self._request_roms(
+            f"{View.PLATFORMS}_id={platform.id}&order_by=name&order_dir=asc&limit=10000"
+        )
+        if roms is None:
+            return None
+        return self._filter_supported_roms(roms, View.PLATFORMS, platform.slug.lower())
+
+    def _request_roms(
+        self, query: str, is_current: Callable[[], bool] = lambda: True
+    ) -> Optional[list[dict[str, Any]]]:
+        """Return the items of an api/roms request, None on errors or once not current."""
+        try:
+            request = Request(
+                f"{self.host}/{self._roms_endpoint}?{query}",
+                headers=self.headers,
+            )
+        except ValueError:
+            self.status.valid_host = False
+            self.status.valid_credentials = False
+            return None
+        try:
+            if request.type not in ("http", "https"):
+                self.status.valid_host = False
+                self.status.valid_credentials = False
+                return None
+            start = time.perf_counter()
+            response = urlopen(request, timeout=60)  # trunk-ignore(bandit/B310)
+        except HTTPError as e:
+            print(f"Fetching ROMs failed: {e}")
+            if e.code == 403:
+                self.status.valid_host = True
+                self.status.valid_credentials = False
+            return None
+        except URLError:
+            self.status.valid_host = False
+            self.status.valid_credentials = False
+            return None
+
+        # Read in chunks to drop the response as soon as the query changed
+        chunks = []
+        with response:
+            while chunk := response.read(64 * 1024):
+                if not is_current():
+                    return None
+                chunks.append(chunk)
+
+        data = b"".join(chunks)
+        self._record_request("request_roms", start, len(data))
+        roms = json.loads(data.decode("utf-8"))
+        if isinstance(roms, dict):
+            roms = roms["items"]
+
+        self.status.valid_host = True
+        self.status.valid_credentials = True
+        return roms
+
+    def _filter_supported_roms(
+        self,
+        roms: list[dict[str, Any]],
+        view: Optional[str] = None,
+        selected_platform_slug: Optional[str] = None,
+    ) -> list[dict[str, Any]]:
+        """Keep the api/roms items of platforms this device has a folder for."""
         # Get the list of subfolders in the ROMs directory for non-muOS filtering
         roms_subfolders = set()
         if not self.file_system.is_muos and not self.file_system.is_spruceos:
@@ -489,51 +596,9 @@ class API:
             if view == View.PLATFORMS and platform_slug != selected_platform_slug:
                 continue
 
-            metadatum = rom.get("metadatum", {})
-            _roms.append(
-                Rom(
-                    id=rom["id"],
-                    platform_id=rom["platform_id"],
-                    platform_slug=rom["platform_slug"],
-                    fs_name=rom["fs_name"],
-                    fs_name_no_tags=rom["fs_name_no_tags"],
-                    fs_name_no_ext=rom["fs_name_no_ext"],
-                    fs_extension=rom["fs_extension"],
-                    fs_size=self._human_readable_size(rom["fs_size_bytes"]),
-                    fs_size_bytes=rom["fs_size_bytes"],
-                    name=rom["name"],
-                    slug=rom["slug"],
-                    summary=rom["summary"],
-                    youtube_video_id=rom.get("youtube_video_id", None),
-                    path_cover_small=rom["path_cover_small"],
-                    path_cover_large=rom["path_cover_large"],
-                    is_identified=rom["is_identified"],
-                    revision=rom.get("revision", None),
-                    regions=rom.get("regions", []),
-                    languages=rom.get("languages", []),
-                    tags=rom.get("tags", []),
-                    crc_hash=rom.get("crc_hash", ""),
-                    md5_hash=rom.get("md5_hash", ""),
-                    sha1_hash=rom.get("sha1_hash", ""),
-                    has_simple_single_file=rom.get("has_simple_single_file", False),
-                    has_nested_single_file=rom.get("has_nested_single_file", False),
-                    has_multiple_files=rom.get("has_multiple_files", False),
-                    merged_screenshots=rom.get("merged_screenshots", []),
-                    genres=metadatum.get("genres", []),
-                    franchises=metadatum.get("franchises", []),
-                    collections=metadatum.get("collections", []),
-                    companies=metadatum.get("companies", []),
-                    game_modes=metadatum.get("game_modes", []),
-                    age_ratings=metadatum.get("age_ratings", []),
-                    first_release_date=metadatum.get("first_release_date", None),
-                    average_rating=metadatum.get("average_rating", None),
-                )
-            )
+            _roms.append(rom)
 
-        self.status.roms = _roms
-        self.status.valid_host = True
-        self.status.valid_credentials = True
-        self.status.roms_ready.set()
+        return _roms
 
     def _reset_download_status(
         self, valid_host: bool = False, valid_credentials: bool = False
@@ -544,11 +609,52 @@ class API:
         self.status.valid_credentials = valid_credentials
         self.status.downloading_rom = None
         self.status.extracting_rom = False
+        self.file_system.forget_rom_presence()
         self.status.multi_selected_roms = []
         self.status.download_queue = []
         self.status.download_rom_ready.set()
         self.status.abort_download.set()
 
+    def get_catalogue_paths(self, rom: Rom) -> Optional[tuple[str, str, str]]:
+        """Return the text, box and preview paths of a ROM in the catalogue."""
+        # Check if the catalogue path is set and valid
+        catalogue_path = self.file_system.get_catalogue_platform_path(rom.platform_slug)
+        if not catalogue_path:
+            return None
+        os.makedirs(catalogue_path, exist_ok=True)
+
+        filename = self._sanitize_filename(rom.fs_name_no_ext)
+        return (
+            os.path.join(catalogue_path, "text", f"{filename}.txt"),
+            os.path.join(catalogue_path, "box", f"{filename}.png"),
+            os.path.join(catalogue_path, "preview", f"{filename}.png"),
+        )
+
+    def write_catalogue_text(self, rom: Rom, text_path: str) -> None:
+        os.makedirs(os.path.dirname(text_path), exist_ok=True)
+        # Written aside then renamed, an existing file is always complete
+        with open(f"{text_path}.tmp", "w") as f:
+            f.write(rom.summary)
+            f.write("\n\n")
+
+            if rom.first_release_date:
+                dt = datetime.datetime.fromtimestamp(rom.first_release_date / 1000)
+                formatted_date = dt.strftime("%Y-%m-%d")
+                f.write(f"First release date: {formatted_date}\n")
+
+            if rom.average_rating:
+                f.write(f"Average rating: {rom.average_rating}\n")
+
+            if rom.genres:
+                f.write(f"Genres: {', '.join(rom.genres)}\n")
+
+            if rom.franchises:
+                f.write(f"Franchises: {', '.join(rom.franchises)}\n")
+
+            if rom.companies:
+                f.write(f"Companies: {', '.join(rom.companies)}\n")
+        os.replace(f"{text_path}.tmp", text_path)
+
     def download_rom(self) -> None:
         self.status.download_queue.sort(key=lambda rom: rom.name)
         for i, rom in enumerate(self.status.download_queue):
@@ -573,6 +679,7 @@ class API:
                     self._reset_download_status()
                     return
                 print(f"Downloading {rom.name} to {dest_path}")
+                start = time.perf_counter()
                 with (
                     urlopen(request) as response,  # trunk-ignore(bandit/B310)
                     open(dest_path, "wb") as out_file,
@@ -599,9 +706,16 @@ class API:
                             self._reset_download_status(True, True)
                             os.remove(dest_path)
                             return
+                downloaded_bytes = self.status.total_downloaded_bytes
+                self.metrics.count("api.bytes", downloaded_bytes)
+                self.metrics.observe(
+                    "download.throughput",
+                    downloaded_bytes / 1024 / max(time.perf_counter() - start, 0.001),
+                )
 
                 # Handle multi-file (ZIP) ROMs
                 if rom.has_multiple_files:
+                    start = time.perf_counter()
                     self.status.extracting_rom = True
                     print("Multi-file rom detected. Extracting...")
                     with zipfile.ZipFile(dest_path, "r") as zip_ref:
@@ -635,6 +749,7 @@ class API:
                     self.status.extracting_rom = False
                     self.status.downloading_rom = None
                     os.remove(dest_path)
+                    self.metrics.observe("extract.seconds", time.perf_counter() - start)
                     print(f"Extracted {rom.name} at {os.path.dirname(dest_path)}")
             except HTTPError as e:
                 if e.code == 403:
@@ -646,58 +761,24 @@ class API:
                 self._reset_download_status(valid_host=True)
                 return
 
-            # Check if the catalogue path is set and valid
-            catalogue_path = self.file_system.get_catalogue_platform_path(
-                rom.platform_slug
-            )
-            if not catalogue_path:
+            self.file_system.forget_rom_presence()
+
+            catalogue_paths = self.get_catalogue_paths(rom)
+            if not catalogue_paths:
                 continue
-            os.makedirs(catalogue_path, exist_ok=True)
+            text_path, box_path, preview_path = catalogue_paths
 
-            filename = self._sanitize_filename(rom.fs_name_no_ext)
             if rom.summary:
-                text_path = os.path.join(
-                    catalogue_path,
-                    "text",
-                    f"{filename}.txt",
-                )
-                os.makedirs(os.path.dirname(text_path), exist_ok=True)
-                with open(text_path, "w") as f:
-                    f.write(rom.summary)
-                    f.write("\n\n")
-
-                    if rom.first_release_date:
-                        dt = datetime.datetime.fromtimestamp(
-                            rom.first_release_date / 1000
-                        )
-                        formatted_date = dt.strftime("%Y-%m-%d")
-                        f.write(f"First release date: {formatted_date}\n")
-
-                    if rom.average_rating:
-                        f.write(f"Average rating: {rom.average_rating}\n")
-
-                    if rom.genres:
-                        f.write(f"Genres: {', '.join(rom.genres)}\n")
-
-                    if rom.franchises:
-                        f.write(f"Franchises: {', '.join(rom.franchises)}\n")
-
-                    if rom.companies:
-                        f.write(f"Companies: {', '.join(rom.companies)}\n")
+                self.write_catalogue_text(rom, text_path)
 
             # Don't download covers and previews if the user disabled the option
-            if not self._download_assets:
+            if not self.download_assets:
                 continue
 
-            box_path = os.path.join(catalogue_path, "box", f"{filename}.png")
-            preview_path = os.path.join(catalogue_path, "preview", f"{filename}.png")
-
-            # Download cover and preview images
-            os.makedirs(os.path.dirname(box_path), exist_ok=True)
-            os.makedirs(os.path.dirname(preview_path), exist_ok=True)
-
-            self.image_utils.process_assets(
-                fullscreen=self._fullscreen_assets,
+            # Generated in the background while the next ROM downloads
+            self.asset_pipeline.submit(
+                rom_name=rom.name,
+                fullscreen=self.fullscreen_assets,
                 cover_url=rom.path_cover_small,
                 screenshot_urls=rom.merged_screenshots,
                 box_path=box_path,
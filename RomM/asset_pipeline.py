@@ -0,0 +1,213 @@
+import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import NamedTuple, Optional, Sequence
+
+from config import getenv_number
+from imageutils import ImageUtils
+
+
+class AssetJob(NamedTuple):
+    rom_name: str
+    fullscreen: bool
+    cover_url: Optional[str]
+    screenshot_url: Optional[str]
+    box_path: str
+    preview_path: str
+    headers: dict
+    queued_at: float
+
+
+class AssetPipeline:
+    """Generates the box and preview images of downloaded ROMs off the download thread.
+
+    Jobs are queued by API.download_rom, which goes on with the next ROM right
+    away. A single thread fetches the cover and screenshot of each job, then
+    hands the bytes to a pool of ASSET_WORKERS threads for the PIL work. PIL
+    releases the GIL while it decodes, resizes and encodes, so the pool runs
+    on the other cores. Worker processes would have to be forked from the
+    SDL process and its threads, or spawned and import main.py again. The
+    thread fetches the next job while the pool renders the previous ones,
+    with at most two jobs per worker in flight.
+
+    The time spent by each job in each stage (queued, fetch, decode, compose,
+    save) is logged, with a summary once the queue is empty.
+    """
+
+    _instance: Optional["AssetPipeline"] = None
+    _initialized: bool = False
+
+    stages = ("queued", "fetch", "decode", "compose", "save")
+
+    def __new__(cls):
+        if not cls._instance:
+            cls._instance = super(AssetPipeline, cls).__new__(cls)
+        return cls._instance
+
+    def __init__(self) -> None:
+        if self._initialized:
+            return
+
+        self.image_utils = ImageUtils()
+        self.workers = max(
+            1, int(getenv_number("ASSET_WORKERS", (os.cpu_count() or 2) - 1))
+        )
+        self._jobs: queue.Queue[AssetJob] = queue.Queue()
+        self._in_flight: deque[tuple[AssetJob, dict[str, float], Future]] = deque()
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._totals = dict.fromkeys(self.stages, 0.0)
+        self._done = 0
+        self._batch_start = 0.0
+        self._initialized = True
+
+    def submit(
+        self,
+        rom_name: str,
+        fullscreen: bool,
+        cover_url: Optional[str],
+        screenshot_urls: Sequence[str],
+        box_path: str,
+        preview_path: str,
+        headers: dict,
+    ) -> None:
+        if not cover_url and not screenshot_urls:
+            return
+
+        with self._lock:
+            if self._jobs.empty() and not self._in_flight:
+                self._batch_start = time.perf_counter()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+        self._jobs.put(
+            AssetJob(
+                rom_name,
+                fullscreen,
+                cover_url,
+                screenshot_urls[0] if screenshot_urls else None,
+                box_path,
+                preview_path,
+                dict(headers),
+                time.perf_counter(),
+            )
+        )
+
+    @property
+    def pending(self) -> int:
+        """Number of jobs queued or being processed."""
+        return self._jobs.qsize() + len(self._in_flight)
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(
+                self.workers, thread_name_prefix="asset_pipeline"
+            )
+        return self._pool
+
+    def _run(self) -> None:
+        while True:
+            try:
+                job = self._jobs.get(timeout=0.1 if self._in_flight else None)
+            except queue.Empty:
+                self._collect(block=True)
+                continue
+            if self._closed:
+                return
+
+            queued = time.perf_counter() - job.queued_at
+            start = time.perf_counter()
+            try:
+                cover_data = (
+                    self.image_utils.fetch_image(job.cover_url, job.headers)
+                    if job.cover_url
+                    else None
+                )
+                screenshot_data = (
+                    self.image_utils.fetch_image(job.screenshot_url, job.headers)
+                    if job.screenshot_url
+                    else None
+                )
+            except Exception as e:
+                # This thread serves every job, it must outlive a bad one
+                print(f"Failed to fetch assets of {job.rom_name}: {e}")
+                self._collect(block=False)
+                continue
+            fetch = time.perf_counter() - start
+
+            args = (
+                job.fullscreen,
+                cover_data,
+                screenshot_data,
+                job.box_path,
+                job.preview_path,
+            )
+            if self._closed:
+                return
+            future = self._get_pool().submit(self.image_utils.render_assets, *args)
+
+            with self._lock:
+                self._in_flight.append(
+                    (job, {"queued": queued, "fetch": fetch}, future)
+                )
+            self._collect(block=len(self._in_flight) >= 2 * self.workers)
+
+    def _collect(self, block: bool) -> None:
+        """Record the timings of the finished jobs, the oldest one first."""
+        while self._in_flight and (block or self._in_flight[0][2].done()):
+            job, timings, future = self._in_flight[0]
+            try:
+                timings.update(future.result())
+            except Exception as e:
+                print(f"Failed to generate assets of {job.rom_name}: {e}")
+            with self._lock:
+                self._in_flight.popleft()
+                for stage, seconds in timings.items():
+                    self._totals[stage] += seconds
+                self._done += 1
+            print(
+                f"Assets of {job.rom_name}: "
+                + ", ".join(f"{k} {v * 1000:.0f}ms" for k, v in timings.items())
+            )
+            block = False
+
+        with self._lock:
+            if self._done and self._jobs.empty() and not self._in_flight:
+                print(self.report())
+                print(f"Asset cache: {self.image_utils.asset_cache.stats()}")
+                self.image_utils.asset_cache.flush()
+                self._totals = dict.fromkeys(self.stages, 0.0)
+                self._done = 0
+
+    def report(self) -> str:
+        wall = time.perf_counter() - self._batch_start
+        averages = ", ".join(
+            f"{stage} {seconds / self._done * 1000:.0f}ms"
+            for stage, seconds in self._totals.items()
+        )
+        return (
+            f"Assets of {self._done} ROMs in {wall:.1f}s with "
+            f"{0 if self._pool is None else self.workers} workers, "
+            f"average per ROM: {averages}"
+        )
+
+    def cleanup(self) -> None:
+        # Images being rendered are finished, queued ones are dropped
+        rendering = sum(
+            1 for _job, _timings, future in self._in_flight if future.running()
+        )
+        dropped = self.pending - rendering
+        if dropped:
+            print(
+                f"Dropped {dropped} asset jobs on exit, "
+                "Rebuild catalogue generates their images"
+            )
+        self._closed = True
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+        self.image_utils.asset_cache.flush()
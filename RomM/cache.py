@@ -0,0 +1,290 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Generic, Hashable, Optional, TypeVar
+
+from config import getenv_number
+from PIL import Image
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class LRUCache(Generic[K, V]):
+    """Thread safe least recently used cache, bounded by the total cost of its values.
+
+    The cost of a value defaults to 1, making max_cost a max number of entries.
+    """
+
+    def __init__(
+        self, max_cost: int, cost: Optional[Callable[[V], int]] = None
+    ) -> None:
+        self.max_cost = max_cost
+        self._cost = cost or (lambda _value: 1)
+        self._entries: OrderedDict[K, tuple[V, int]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.total_cost = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: K) -> bool:
+        return key in self._entries
+
+    def get(self, key: K) -> Optional[V]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: K, value: V) -> None:
+        cost = self._cost(value)
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.total_cost -= previous[1]
+
+            # Values bigger than the whole budget are not cached at all
+            if cost > self.max_cost:
+                return
+
+            self._entries[key] = (value, cost)
+            self.total_cost += cost
+            while self.total_cost > self.max_cost:
+                _key, (_value, evicted_cost) = self._entries.popitem(last=False)
+                self.total_cost -= evicted_cost
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.total_cost = 0
+
+    def stats(self) -> str:
+        lookups = self.hits + self.misses
+        hit_rate = (self.hits / lookups * 100) if lookups else 0.0
+        return (
+            f"{len(self._entries)} entries, {self.total_cost}/{self.max_cost} cost, "
+            f"{self.hits} hits, {self.misses} misses ({hit_rate:.1f}% hit rate)"
+        )
+
+
+class ImageCache:
+    """Decoded images read from disk, keyed by path and modification time.
+
+    Images are converted to RGBA once when decoded, so they can be pasted
+    with their own alpha as mask without any per-frame conversion. A file
+    rewritten on disk gets a new mtime and is decoded again.
+    """
+
+    _instance: Optional["ImageCache"] = None
+    _initialized: bool = False
+
+    # Decoded bytes kept in memory
+    max_bytes = 8 * 1024 * 1024
+
+    def __new__(cls):
+        if not cls._instance:
+            cls._instance = super(ImageCache, cls).__new__(cls)
+        return cls._instance
+
+    def __init__(self) -> None:
+        if self._initialized:
+            return
+
+        self._images: LRUCache[tuple[str, int], Image.Image] = LRUCache(
+            self.max_bytes, cost=lambda image: image.width * image.height * 4
+        )
+        # Files that failed to decode, not retried until they change
+        self._unreadable: set[tuple[str, int]] = set()
+        self._initialized = True
+
+    @property
+    def hits(self) -> int:
+        return self._images.hits
+
+    @property
+    def misses(self) -> int:
+        return self._images.misses
+
+    def stats(self) -> str:
+        return self._images.stats()
+
+    def load(self, path: str) -> Optional[Image.Image]:
+        """Return the decoded RGBA image at path, or None if it can't be read."""
+        try:
+            key = (path, os.stat(path).st_mtime_ns)
+        except OSError:
+            return None
+
+        image = self._images.get(key)
+        if image is None and key not in self._unreadable:
+            try:
+                with Image.open(path) as source:
+                    image = source.convert("RGBA")
+            except OSError as e:
+                print(f"Error loading image {path}: {e}")
+                self._unreadable.add(key)
+                return None
+            self._images.put(key, image)
+        return image
+
+
+class AssetCache:
+    """Downloaded cover and screenshot files, kept on disk across runs.
+
+    Entries are keyed by URL host and path and point to files named after the SHA-256
+    of their content, so art shared by several ROMs (regional variants...)
+    is stored once. Entries validated less than ASSET_CACHE_DAYS ago are used
+    without any request, older ones are revalidated with their ETag. The
+    files are capped to ASSET_CACHE_MB, the least recently used go first.
+    """
+
+    _instance: Optional["AssetCache"] = None
+    _initialized: bool = False
+
+    def __new__(cls):
+        if not cls._instance:
+            cls._instance = super(AssetCache, cls).__new__(cls)
+        return cls._instance
+
+    def __init__(self) -> None:
+        if self._initialized:
+            return
+
+        self.path = os.getenv(
+            "ASSET_CACHE_PATH", os.path.join(os.getcwd(), "cache", "assets")
+        )
+        self.max_bytes = int(getenv_number("ASSET_CACHE_MB", 64) * 1024 * 1024)
+        self.max_age = getenv_number("ASSET_CACHE_DAYS", 7) * 24 * 3600
+        self._index_path = os.path.join(self.path, "index.json")
+        self._lock = threading.Lock()
+        # URL host and path -> {"digest", "etag", "size", "validated", "used"}
+        self._entries: dict[str, dict[str, Any]] = self._load_index()
+        self._sizes = {e["digest"]: e["size"] for e in self._entries.values()}
+        self.total_bytes = sum(self._sizes.values())
+        self._dirty = False
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+        self._initialized = True
+
+    def _load_index(self) -> dict[str, dict[str, Any]]:
+        try:
+            with open(self._index_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self.path, digest[:2], digest)
+
+    def lookup(self, key: str) -> Optional[tuple[Optional[str], bool]]:
+        """Return the ETag of a cached entry and whether it is still fresh."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            return entry["etag"], time.time() - entry["validated"] < self.max_age
+
+    def read(self, key: str, revalidated: bool = False) -> Optional[bytes]:
+        """Return the cached bytes of key, counted as a download saved."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            try:
+                with open(self._blob_path(entry["digest"]), "rb") as f:
+                    data = f.read()
+            except OSError:
+                self._remove(key)
+                return None
+            entry["used"] = time.time()
+            if revalidated:
+                entry["validated"] = entry["used"]
+            self._dirty = True
+            self.hits += 1
+            self.bytes_saved += len(data)
+            return data
+
+    def put(self, key: str, data: bytes, etag: Optional[str]) -> None:
+        digest = hashlib.sha256(data).hexdigest()
+        with self._lock:
+            if key in self._entries:
+                # Stale and changed on the server, absent ones count in lookup
+                self.misses += 1
+                self._remove(key)
+            if digest not in self._sizes:
+                if len(data) > self.max_bytes:
+                    return
+                blob_path = self._blob_path(digest)
+                try:
+                    os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+                    with open(f"{blob_path}.tmp", "wb") as f:
+                        f.write(data)
+                    os.replace(f"{blob_path}.tmp", blob_path)
+                except OSError as e:
+                    print(f"Error writing asset cache {blob_path}: {e}")
+                    return
+                self._sizes[digest] = len(data)
+                self.total_bytes += len(data)
+
+            now = time.time()
+            self._entries[key] = {
+                "digest": digest,
+                "etag": etag,
+                "size": len(data),
+                "validated": now,
+                "used": now,
+            }
+            self._evict()
+            self._dirty = True
+
+    def _evict(self) -> None:
+        by_use = sorted(self._entries, key=lambda key: self._entries[key]["used"])
+        for key in by_use:
+            if self.total_bytes <= self.max_bytes:
+                break
+            self._remove(key)
+
+    def _remove(self, key: str) -> None:
+        """Drop an entry, and its file once no other entry has the same content."""
+        digest = self._entries.pop(key)["digest"]
+        if any(entry["digest"] == digest for entry in self._entries.values()):
+            return
+        self.total_bytes -= self._sizes.pop(digest, 0)
+        try:
+            os.remove(self._blob_path(digest))
+        except OSError:
+            pass
+
+    def flush(self) -> None:
+        """Write the index to disk if it changed."""
+        with self._lock:
+            if not self._dirty:
+                return
+            try:
+                os.makedirs(self.path, exist_ok=True)
+                with open(f"{self._index_path}.tmp", "w") as f:
+                    json.dump(self._entries, f)
+                os.replace(f"{self._index_path}.tmp", self._index_path)
+                self._dirty = False
+            except OSError as e:
+                print(f"Error writing asset cache index: {e}")
+
+    def stats(self) -> str:
+        return (
+            f"{len(self._entries)} entries, {len(self._sizes)} files, "
+            f"{self.total_bytes / 1024:.0f}/{self.max_bytes / 1024:.0f}KB, "
+            f"{self.hits} hits, {self.misses} misses, "
+            f"{self.bytes_saved / 1024:.0f}KB saved"
+        )
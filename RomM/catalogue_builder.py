@@ -0,0 +1,177 @@
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Optional
+
+from api import API
+from filesystem import Filesystem
+from models import Rom
+from rom_table import RomTable
+
+
+class CatalogueBuilder:
+    """Writes the missing catalogue files of the ROMs already on the device.
+
+    ROMs copied by hand, or downloaded while DOWNLOAD_ASSETS was off, never
+    got their text, box and preview files from download_rom. rebuild()
+    fetches the remote list of each platform with a ROM folder on the
+    device, keeps the ROMs whose files are there, and generates only the
+    catalogue files they are missing. Files are written aside then renamed,
+    so a rebuild stopped halfway resumes where it was on the next run.
+
+    Cover and screenshot downloads run on fetch_threads threads and land in
+    the asset cache, the asset pipeline then renders them from there. The
+    downloads only run ahead of the pipeline by half of the cache size, so
+    they are not evicted before being rendered.
+    """
+
+    # Concurrent image downloads
+    fetch_threads = 4
+
+    def __init__(self, api: API) -> None:
+        self.api = api
+        self.fs = Filesystem()
+        self.status = api.status
+        self._cancel = threading.Event()
+        # Downloaded by _fetch_assets, to estimate the size of queued images
+        self._fetched_bytes = 0
+        self._fetched_roms = 0
+
+    def start(self) -> None:
+        if not self.status.catalogue_ready.is_set():
+            return
+        self.status.catalogue_ready.clear()
+        self._cancel.clear()
+        threading.Thread(target=self.rebuild, daemon=True).start()
+
+    def cancel(self) -> None:
+        self._cancel.set()
+
+    def rebuild(self) -> None:
+        start = time.perf_counter()
+        try:
+            roms = self._find_device_roms()
+            if roms is not None:
+                self._build(roms)
+        finally:
+            self.status.catalogue_step = ""
+            self.status.catalogue_ready.set()
+        print(f"Catalogue rebuild done in {time.perf_counter() - start:.1f}s")
+
+    def _find_device_roms(self) -> Optional[list[Rom]]:
+        """Match the ROM files of each platform folder to the remote ROM list."""
+        self.fs.forget_rom_presence()
+        device_roms: list[Rom] = []
+        for platform in list(self.status.platforms):
+            if self._cancel.is_set():
+                return None
+            # Platforms without a folder have no ROM to match, skip their list
+            if not os.path.isdir(self.fs.get_platforms_storage_path(platform.slug)):
+                continue
+
+            self.status.catalogue_step = f"Matching {platform.display_name} ROMs"
+            items = self.api.fetch_platform_roms(platform)
+            if items is None:
+                print(f"Catalogue rebuild stopped, can't list {platform.slug} ROMs")
+                return None
+            device_roms.extend(
+                RomTable.from_payload(items).where(
+                    ("platform_slug", "fs_name", "has_multiple_files"),
+                    self.fs.is_rom_file_in_device,
+                )
+            )
+        return device_roms
+
+    def _build(self, roms: list[Rom]) -> None:
+        self.status.catalogue_done = 0
+        self.status.catalogue_total = len(roms)
+        texts = assets = complete = 0
+
+        in_flight: set[Future] = set()
+        with ThreadPoolExecutor(self.fetch_threads) as executor:
+            for rom in roms:
+                if self._cancel.is_set():
+                    break
+                self.status.catalogue_step = rom.name
+                self.status.catalogue_done += 1
+
+                catalogue_paths = self.api.get_catalogue_paths(rom)
+                if not catalogue_paths:
+                    continue
+                text_path, box_path, preview_path = catalogue_paths
+
+                missing = False
+                if rom.summary and not os.path.exists(text_path):
+                    self.api.write_catalogue_text(rom, text_path)
+                    texts += 1
+                    missing = True
+                if self._needs_assets(rom, box_path, preview_path):
+                    in_flight.add(
+                        executor.submit(self._fetch_assets, rom, box_path, preview_path)
+                    )
+                    assets += 1
+                    missing = True
+                if not missing:
+                    complete += 1
+
+                # Don't queue downloads for the whole library at once
+                if len(in_flight) >= 2 * self.fetch_threads:
+                    _done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                self._wait_for_pipeline()
+
+            if self._cancel.is_set():
+                for future in in_flight:
+                    future.cancel()
+
+        print(
+            f"Catalogue: {len(roms)} ROMs on device, {complete} already complete, "
+            f"{texts} texts written, {assets} queued for art"
+        )
+
+        # Art is still rendered by the asset pipeline
+        while self.api.asset_pipeline.pending and not self._cancel.is_set():
+            self.status.catalogue_step = (
+                f"Rendering art, {self.api.asset_pipeline.pending} left"
+            )
+            time.sleep(0.1)
+
+    def _wait_for_pipeline(self) -> None:
+        """Wait while the images not rendered yet take half of the asset cache."""
+        budget = self.api.image_utils.asset_cache.max_bytes / 2
+        while self._fetched_roms and not self._cancel.is_set():
+            average = self._fetched_bytes / self._fetched_roms
+            if self.api.asset_pipeline.pending * average <= budget:
+                return
+            time.sleep(0.1)
+
+    def _needs_assets(self, rom: Rom, box_path: str, preview_path: str) -> bool:
+        if not self.api.download_assets:
+            return False
+        screenshots = len(rom.merged_screenshots) > 0
+        has_box = rom.path_cover_small or (self.api.fullscreen_assets and screenshots)
+        return bool(
+            (has_box and not os.path.exists(box_path))
+            or (screenshots and not os.path.exists(preview_path))
+        )
+
+    def _fetch_assets(self, rom: Rom, box_path: str, preview_path: str) -> None:
+        # Warm the asset cache, the pipeline then reads the images from it
+        fetched = 0
+        for url in (rom.path_cover_small, *rom.merged_screenshots[:1]):
+            if url and not self._cancel.is_set():
+                data = self.api.image_utils.fetch_image(url, self.api.headers)
+                fetched += len(data or b"")
+        self._fetched_bytes += fetched
+        self._fetched_roms += 1
+        if self._cancel.is_set():
+            return
+        self.api.asset_pipeline.submit(
+            rom_name=rom.name,
+            fullscreen=self.api.fullscreen_assets,
+            cover_url=rom.path_cover_small,
+            screenshot_urls=rom.merged_screenshots,
+            box_path=box_path,
+            preview_path=preview_path,
+            headers=self.api.headers,
+        )
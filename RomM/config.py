@@ -1,3 +1,4 @@
+import math
 import os
 import re
 from typing import TypedDict
@@ -52,6 +53,22 @@ BUTTON_CONFIGS: ButtonConfigs = {
 CONTROLLER_LAYOUT = os.getenv("CONTROLLER_LAYOUT", "nintendo").lower()
 
 
+def getenv_number(key: str, default: float) -> float:
+    """Read a numeric setting, or the default when it is unset or not a number."""
+    value = os.getenv(key)
+    if not value:
+        return default
+    try:
+        number = float(value)
+    except ValueError:
+        number = math.nan
+    # float() also accepts "nan" and "inf", which no setting can use
+    if not math.isfinite(number):
+        print(f"Error: {key} is not a number: {value!r}, using {default}")
+        return default
+    return number
+
+
 def get_controller_layout() -> ButtonConfig:
     """Return the current controller layout configuration."""
     if CONTROLLER_LAYOUT not in BUTTON_CONFIGS:
@@ -2,11 +2,13 @@ import os
 from typing import Optional
 
 import platform_maps
+from metrics import Metrics
 from models import Rom
 
 
 class Filesystem:
     _instance: Optional["Filesystem"] = None
+    _initialized: bool = False
 
     # Check if app is running on muOS
     is_muos = os.path.exists("/mnt/mmc/MUOS")
@@ -23,12 +25,23 @@ class Filesystem:
     # Resources path: Use current working directory + "resources"
     resources_path = os.path.join(os.getcwd(), "resources")
 
+    # Incremented each time the cached ROM presence is dropped
+    rom_presence_version = 0
+
     def __new__(cls):
         if not cls._instance:
             cls._instance = super(Filesystem, cls).__new__(cls)
         return cls._instance
 
     def __init__(self) -> None:
+        # Paths are probed once, not each time a module gets the instance
+        if self._initialized:
+            return
+
+        # Cached results of is_rom_file_in_device, keyed by ROM path
+        self._rom_presence: dict[str, bool] = {}
+        self.metrics = Metrics()
+
         # Optionally ensure resources directory exists (not required for roms dir)
         if not os.path.exists(self.resources_path):
             os.makedirs(self.resources_path, exist_ok=True)
@@ -91,6 +104,7 @@ class Filesystem:
                 1 if os.path.exists(self._sd1_roms_storage_path) else 2,
             )
         )
+        self._initialized = True
 
     ###
     # PRIVATE METHODS
@@ -168,6 +182,7 @@ class Filesystem:
             self._current_sd = 2
         else:
             self._current_sd = 1
+        self.forget_rom_presence()
 
     def get_roms_storage_path(self) -> str:
         """Return the current SD storage path."""
@@ -194,8 +209,25 @@ class Filesystem:
 
     def is_rom_in_device(self, rom: Rom) -> bool:
         """Check if a ROM exists in the storage path."""
+        return self.is_rom_file_in_device(
+            rom.platform_slug, rom.fs_name, rom.has_multiple_files
+        )
+
+    def is_rom_file_in_device(
+        self, platform_slug: str, fs_name: str, has_multiple_files: bool
+    ) -> bool:
+        """Check if a ROM file exists in the storage path, without a Rom row."""
         rom_path = os.path.join(
-            self.get_platforms_storage_path(rom.platform_slug),
-            rom.fs_name if not rom.has_multiple_files else f"{rom.fs_name}.m3u",
+            self.get_platforms_storage_path(platform_slug),
+            fs_name if not has_multiple_files else f"{fs_name}.m3u",
         )
-        return os.path.exists(rom_path)
+        in_device = self._rom_presence.get(rom_path)
+        if in_device is None:
+            self.metrics.count("fs.stat_calls")
+            in_device = self._rom_presence[rom_path] = os.path.exists(rom_path)
+        return in_device
+
+    def forget_rom_presence(self) -> None:
+        """Drop cached ROM presence, call after ROM files are added or removed."""
+        self._rom_presence = {}
+        self.rom_presence_version += 1
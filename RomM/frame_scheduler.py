@@ -0,0 +1,153 @@
+import os
+import time
+from collections import deque
+from typing import Callable, Optional
+
+from config import getenv_number
+
+# Upper bounds of the frame time histogram buckets, in milliseconds
+HISTOGRAM_BUCKETS_MS = (2, 4, 8, 16, 33, 66, 100, float("inf"))
+
+
+class FrameTimings:
+    """Rolling window of the time spent in each phase of the drawn frames.
+
+    update: deciding whether to draw (state snapshot, input check)
+    draw: building the frame, input handling included (RomM.update)
+    present: uploading and presenting the frame (render_to_screen)
+    """
+
+    phases = ("update", "draw", "present")
+
+    def __init__(self, window: int = 600) -> None:
+        self.samples: dict[str, deque[float]] = {
+            phase: deque(maxlen=window) for phase in self.phases
+        }
+        self.frames = 0
+
+    def record(self, update: float, draw: float, present: float) -> None:
+        """Record the durations (in seconds) of the phases of one drawn frame."""
+        self.samples["update"].append(update * 1000)
+        self.samples["draw"].append(draw * 1000)
+        self.samples["present"].append(present * 1000)
+        self.frames += 1
+
+    def histogram(self, phase: str) -> list[int]:
+        """Number of recent frames in each of HISTOGRAM_BUCKETS_MS."""
+        counts = [0] * len(HISTOGRAM_BUCKETS_MS)
+        for ms in self.samples[phase]:
+            for i, bound in enumerate(HISTOGRAM_BUCKETS_MS):
+                if ms <= bound:
+                    counts[i] += 1
+                    break
+        return counts
+
+    def percentile(self, phase: str, percent: float) -> float:
+        samples = sorted(self.samples[phase])
+        if not samples:
+            return 0.0
+        return samples[min(len(samples) - 1, int(len(samples) * percent / 100))]
+
+    def summary(self) -> list[str]:
+        """One line per phase with the average, 95th percentile and max in ms."""
+        lines = []
+        for phase in self.phases:
+            samples = self.samples[phase]
+            average = sum(samples) / len(samples) if samples else 0.0
+            lines.append(
+                f"{phase}: avg {average:.1f} p95 {self.percentile(phase, 95):.1f} "
+                f"max {max(samples, default=0.0):.1f} ms"
+            )
+        return lines
+
+    def report(self) -> str:
+        buckets = " ".join(
+            f"<={bound:g}"
+            if bound != float("inf")
+            else f">{HISTOGRAM_BUCKETS_MS[-2]:g}"
+            for bound in HISTOGRAM_BUCKETS_MS
+        )
+        lines = [f"Frame timings, last {len(self.samples['draw'])} drawn frames:"]
+        for phase, summary in zip(self.phases, self.summary(), strict=True):
+            histogram = " ".join(str(count) for count in self.histogram(phase))
+            lines.append(f"  {summary} | ms {buckets}: {histogram}")
+        return "\n".join(lines)
+
+
+class FrameScheduler:
+    """Paces the main loop on frame deadlines instead of a fixed sleep.
+
+    While frames are animated or input is active the loop runs at FRAME_RATE,
+    waiting only for what is left of the frame period. Otherwise it checks
+    for changes at IDLE_FRAME_RATE. The wait is spent blocked on SDL events,
+    an input event ends it early so the next frame is drawn right away.
+    With VSYNC, presenting a frame already waits for the display so drawn
+    frames are followed by an event poll only.
+
+    FRAME_STATS=log prints the frame timings every stats_interval seconds,
+    FRAME_STATS=overlay draws their summary on screen.
+    """
+
+    # Seconds between two frame timings reports in the log
+    stats_interval = 10.0
+
+    def __init__(self) -> None:
+        self.frame_period = 1 / max(1, int(getenv_number("FRAME_RATE", 60)))
+        self.idle_period = 1 / max(1, int(getenv_number("IDLE_FRAME_RATE", 20)))
+        self.vsync = os.getenv("VSYNC", "false").lower() in ("true", "1")
+        self.stats_mode = os.getenv("FRAME_STATS", "").lower()
+        self.timings = FrameTimings()
+
+        self._deadline = time.perf_counter()
+        self._last_report = time.perf_counter()
+
+    @property
+    def show_overlay(self) -> bool:
+        return self.stats_mode == "overlay"
+
+    def frame_done(
+        self,
+        update: float,
+        draw: Optional[float] = None,
+        present: Optional[float] = None,
+    ) -> None:
+        """Record the phases of the last loop iteration, draw and present if drawn."""
+        if draw is None or present is None:
+            return
+        self.timings.record(update, draw, present)
+        if (
+            self.stats_mode == "log"
+            and time.perf_counter() - self._last_report >= self.stats_interval
+        ):
+            print(self.timings.report())
+            self._last_report = time.perf_counter()
+
+    def wait(
+        self,
+        active: bool,
+        presented: bool,
+        wait_events: Callable[[int], bool],
+    ) -> None:
+        """Handle events until the next frame is due.
+
+        active: something animates or input is in progress
+        presented: a frame was presented during this iteration
+        wait_events: handles the events arriving within a timeout in ms,
+        returns whether there was any (see RomM.wait_events)
+        """
+        now = time.perf_counter()
+        if presented and self.vsync:
+            # RenderPresent already waited for the vertical blank
+            self._deadline = now
+        else:
+            self._deadline += self.frame_period if active else self.idle_period
+            if self._deadline < now:
+                # Late frame, start over from now instead of catching up
+                self._deadline = now
+
+        if wait_events(int((self._deadline - now) * 1000)):
+            self._deadline = time.perf_counter()
+
+    def cleanup(self) -> None:
+        if self.stats_mode and self.timings.frames:
+            print(self.timings.report())
@@ -1,12 +1,22 @@
 import os
+import time
 from io import BytesIO
-from typing import Optional
+from typing import Optional, Sequence
 from urllib.error import HTTPError, URLError
-from urllib.parse import urljoin
+from urllib.parse import urljoin, urlparse
 from urllib.request import Request, urlopen
 
+from cache import AssetCache
 from PIL import Image, ImageDraw
 
+# Resampling filters from cheapest to most expensive
+RESAMPLE_FILTERS = {
+    "nearest": Image.Resampling.NEAREST,
+    "bilinear": Image.Resampling.BILINEAR,
+    "bicubic": Image.Resampling.BICUBIC,
+    "lanczos": Image.Resampling.LANCZOS,
+}
+
 
 class ImageUtils:
     _instance: Optional["ImageUtils"] = None
@@ -15,6 +25,14 @@ class ImageUtils:
     screen_width = 640
     screen_height = 480
 
+    # Size of the box the cover is fitted in
+    max_cover_width = 215
+    max_cover_height = screen_height * 3 // 5
+
+    # Images are first reduced by an integer factor while this many times
+    # bigger than their final size, then resampled with the chosen filter
+    reducing_gap = 3.0
+
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super(ImageUtils, cls).__new__(cls)
@@ -25,14 +43,24 @@ class ImageUtils:
             return
 
         self.host = os.getenv("HOST", "").strip("/")
-        self.fade_mask = self.generate_fade_mask()
+        self.asset_cache = AssetCache()
+        self.resample = RESAMPLE_FILTERS.get(
+            os.getenv("ASSET_RESAMPLE", "bicubic").lower(), Image.Resampling.BICUBIC
+        )
+        self._fade_mask: Optional[Image.Image] = None
         self._initialized = True
 
+    @property
+    def fade_mask(self) -> Image.Image:
+        # Only fullscreen assets use it, generated on the first one
+        if self._fade_mask is None:
+            self._fade_mask = self.generate_fade_mask()
+        return self._fade_mask
+
     def generate_fade_mask(self) -> Image.Image:
-        fade_mask = Image.new("L", (self.screen_width, self.screen_height), 0)
-        draw = ImageDraw.Draw(fade_mask)
         x_crit = self.screen_width / 3.0
 
+        row = bytearray(self.screen_width)
         for x in range(self.screen_width):
             if x < x_crit:
                 t = x / x_crit
@@ -40,9 +68,12 @@ class ImageUtils:
             else:
                 t = (x - x_crit) / (self.screen_width - x_crit)
                 alpha = int(85 + t * (255 - 85))
-            draw.line([(x, 0), (x, self.screen_height)], fill=alpha)
+            row[x] = alpha
 
-        return fade_mask
+        # Every column has a single alpha, stretch the row to the full height
+        return Image.frombytes("L", (self.screen_width, 1), bytes(row)).resize(
+            (self.screen_width, self.screen_height), Image.Resampling.NEAREST
+        )
 
     def add_rounded_corners(self, image: Image.Image, radius: int = 20):
         rounded_mask = Image.new("L", image.size, 0)
@@ -53,25 +84,95 @@ class ImageUtils:
         image.putalpha(rounded_mask)
         return image
 
-    def load_image_from_url(self, url: str, headers: dict) -> Image.Image | None:
-        try:
-            # Use urljoin to properly resolve relative URLs against the host
-            if url:
-                url = urljoin(f"{self.host}/", url)
+    def fetch_image(self, url: str, headers: dict) -> bytes | None:
+        """Return the encoded bytes of an image, None on errors.
+
+        Images are read from the asset cache while fresh, and downloaded
+        again only when the server says they changed since.
+        """
+        # Use urljoin to properly resolve relative URLs against the host
+        if url:
+            url = urljoin(f"{self.host}/", url)
+        url = url.split("?")[0]
+        # Keyed by host too, each RomM server has its own art at the same paths
+        parsed = urlparse(url)
+        key = f"{parsed.netloc}{parsed.path}"
 
-            req = Request(url.split("?")[0], headers=headers)
+        request_headers = headers
+        cached = self.asset_cache.lookup(key)
+        if cached is not None:
+            etag, fresh = cached
+            data = self.asset_cache.read(key) if fresh else None
+            if data is not None:
+                return data
+            if etag:
+                request_headers = {**headers, "If-None-Match": etag}
+
+        try:
+            req = Request(url, headers=request_headers)
             with urlopen(req, timeout=60) as response:  # trunk-ignore(bandit/B310)
                 data = response.read()
-            return Image.open(BytesIO(data)).convert("RGBA")
-        except (URLError, HTTPError, IOError) as e:
+                etag = response.headers.get("ETag")
+        except HTTPError as e:
+            if e.code == 304:
+                data = self.asset_cache.read(key, revalidated=True)
+                if data is not None:
+                    return data
+                # The cached file is gone and read() dropped its entry, so
+                # this time the request has no If-None-Match
+                return self.fetch_image(url, headers)
             print(f"Error loading image from URL {url}: {e}")
             return None
+        except (URLError, IOError) as e:
+            print(f"Error loading image from URL {url}: {e}")
+            # Better stale than nothing while offline
+            return self.asset_cache.read(key) if cached is not None else None
+
+        self.asset_cache.put(key, data, etag)
+        return data
+
+    def decode_image(
+        self,
+        data: bytes | None,
+        size: tuple[int, int] | None = None,
+        fit: bool = False,
+    ) -> Image.Image | None:
+        """Decode an image to RGBA, scaled to size if given.
+
+        With fit, the image keeps its aspect ratio and fits in size instead.
+        JPEGs are decoded straight at the smallest 1/2, 1/4 or 1/8 scale
+        still bigger than size, other formats are reduced after decoding.
+        """
+        if not data:
+            return None
+        try:
+            image = Image.open(BytesIO(data))
+            if size is None:
+                return image.convert("RGBA")
+
+            if fit:
+                scale = min(size[0] / image.width, size[1] / image.height)
+                size = (int(image.width * scale), int(image.height * scale))
+            image.draft(None, size)
+            if image.mode not in ("RGB", "RGBA"):
+                image = image.convert("RGBA")
+            if image.size != size:
+                image = image.resize(
+                    size, self.resample, reducing_gap=self.reducing_gap
+                )
+            return image.convert("RGBA")
+        except (IOError, ValueError) as e:
+            print(f"Error decoding image: {e}")
+            return None
+
+    def load_image_from_url(self, url: str, headers: dict) -> Image.Image | None:
+        return self.decode_image(self.fetch_image(url, headers))
 
     def process_assets(
         self,
         fullscreen: bool,
         cover_url: str | None,
-        screenshot_urls: list[str],
+        screenshot_urls: Sequence[str],
         box_path: str,
         preview_path: str,
         headers: dict,
@@ -79,18 +180,47 @@ class ImageUtils:
         if not cover_url and not screenshot_urls:
             return
 
+        self.render_assets(
+            fullscreen,
+            self.fetch_image(cover_url, headers) if cover_url else None,
+            self.fetch_image(screenshot_urls[0], headers) if screenshot_urls else None,
+            box_path,
+            preview_path,
+        )
+
+    def save_image(self, image: Image.Image, path: str) -> None:
+        """Save a PNG aside then rename it, an existing file is always complete."""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        image.save(f"{path}.tmp", "PNG")
+        os.replace(f"{path}.tmp", path)
+
+    def render_assets(
+        self,
+        fullscreen: bool,
+        cover_data: bytes | None,
+        screenshot_data: bytes | None,
+        box_path: str,
+        preview_path: str,
+    ) -> dict[str, float]:
+        """Write the box and preview images from the downloaded cover and screenshot.
+
+        Returns the seconds spent decoding (scaling included), compositing
+        and saving.
+        """
+        timings = {"decode": 0.0, "compose": 0.0, "save": 0.0}
+        start = time.perf_counter()
+
         final_width, final_height = self.screen_width, self.screen_height
         background = None
-        preview = (
-            self.load_image_from_url(screenshot_urls[0], headers)
-            if len(screenshot_urls) > 0
-            else None
-        )
+        preview = self.decode_image(screenshot_data, (final_width, final_height))
+        timings["decode"] += time.perf_counter() - start
 
         if preview:
-            preview = preview.resize((final_width, final_height))
-            preview.save(preview_path)
+            start = time.perf_counter()
+            self.save_image(preview, preview_path)
+            timings["save"] += time.perf_counter() - start
 
+        start = time.perf_counter()
         if fullscreen:
             if preview:
                 background = preview
@@ -99,18 +229,17 @@ class ImageUtils:
                     "RGBA", (final_width, final_height), (0, 0, 0, 0)
                 )
             background.putalpha(self.fade_mask)
+        timings["compose"] += time.perf_counter() - start
 
-        foreground = self.load_image_from_url(cover_url, headers) if cover_url else None
+        start = time.perf_counter()
+        foreground = self.decode_image(
+            cover_data, (self.max_cover_width, self.max_cover_height), fit=True
+        )
+        timings["decode"] += time.perf_counter() - start
 
+        start = time.perf_counter()
         if foreground:
-            max_cover_width = 215
-            max_cover_height = int(final_height * 3 / 5)
-            scale_w = max_cover_width / foreground.width
-            scale_h = max_cover_height / foreground.height
-            scale = min(scale_w, scale_h)
-            new_cover_width = int(foreground.width * scale)
-            new_cover_height = int(foreground.height * scale)
-            foreground = foreground.resize((new_cover_width, new_cover_height))
+            new_cover_width, new_cover_height = foreground.size
             foreground = self.add_rounded_corners(foreground)
 
             fg_x = final_width - new_cover_width - 20
@@ -121,5 +250,11 @@ class ImageUtils:
             else:
                 background = foreground
 
+        timings["compose"] += time.perf_counter() - start
+
         if background:
-            background.save(box_path)
+            start = time.perf_counter()
+            self.save_image(background, box_path)
+            timings["save"] += time.perf_counter() - start
+
+        return timings
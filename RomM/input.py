@@ -1,6 +1,5 @@
 import os
 import time
-from threading import Lock
 from typing import Any, Dict, Optional
 
 import sdl2
@@ -44,7 +43,9 @@ class Input:
             return
 
         self._initialized = True
-        self._input_lock = Lock()
+
+        # Events are handled and keys read on the main thread only, see
+        # RomM.wait_events, so the key state needs no locking
 
         # Track the state of all keys
         self._keys_pressed: set[str] = set()
@@ -115,16 +116,14 @@ class Input:
 
     def _add_key_pressed(self, key_name: str) -> None:
         """Add a key to the pressed set"""
-        with self._input_lock:
-            self._keys_pressed.add(key_name)
-            self._keys_held.add(key_name)
-            self._keys_held_start_time[key_name] = time.time()
+        self._keys_pressed.add(key_name)
+        self._keys_held.add(key_name)
+        self._keys_held_start_time[key_name] = time.time()
 
     def _remove_key_held(self, key_name: str) -> None:
         """Remove a key from the pressed set"""
-        with self._input_lock:
-            self._keys_held.discard(key_name)
-            self._keys_held_start_time.pop(key_name, None)
+        self._keys_held.discard(key_name)
+        self._keys_held_start_time.pop(key_name, None)
 
     def check_event(self, event=None) -> bool:
         """
@@ -173,17 +172,20 @@ class Input:
 
     def key(self, key_name: str) -> bool:
         """Check if a specific key is pressed with an optional value check"""
-        with self._input_lock:
-            is_pressed = key_name in self._keys_pressed
-            self._keys_pressed.discard(key_name)
+        is_pressed = key_name in self._keys_pressed
+        self._keys_pressed.discard(key_name)
+
+        if key_name in self._keys_held:
+            # Check if the key is held down
+            held_time = time.time() - self._keys_held_start_time[key_name]
+            if held_time >= self._initial_delay:
+                is_pressed = True
 
-            if key_name in self._keys_held:
-                # Check if the key is held down
-                held_time = time.time() - self._keys_held_start_time[key_name]
-                if held_time >= self._initial_delay:
-                    is_pressed = True
+        return is_pressed
 
-            return is_pressed
+    def has_activity(self) -> bool:
+        """Check if any key is pressed or held down"""
+        return bool(self._keys_pressed or self._keys_held)
 
     def handle_navigation(
         self, selected_position: int, items_per_page: int, total_items: int
@@ -240,18 +242,16 @@ class Input:
 
     def clear_pressed(self) -> None:
         """Clear the pressed keys"""
-        with self._input_lock:
-            self._keys_pressed.clear()
+        self._keys_pressed.clear()
 
     def cleanup(self) -> None:
         """Clean up SDL resources"""
-        with self._input_lock:
-            for controller in self.controllers:
-                sdl2.SDL_GameControllerClose(controller)
-
-            self.controllers = []  # Clear the list of controllers
-            self._keys_pressed = set()
-            self._keys_held = set()
-            self._keys_held_start_time = {}
+        for controller in self.controllers:
+            sdl2.SDL_GameControllerClose(controller)
+
+        self.controllers = []  # Clear the list of controllers
+        self._keys_pressed = set()
+        self._keys_held = set()
+        self._keys_held_start_time = {}
 
         sdl2.SDL_QuitSubSystem(sdl2.SDL_INIT_GAMECONTROLLER)
@@ -2,6 +2,7 @@
 
 import os
 import sys
+import time
 import zipfile
 
 # Add dependencies to path
@@ -9,42 +10,67 @@ base_path = os.path.dirname(os.path.abspath(__file__))
 libs_path = os.path.join(base_path, "deps")
 sys.path.insert(0, libs_path)
 
-import sdl2
-from config import set_controller_layout
-from dotenv import load_dotenv
-from platform_maps import init_env_maps
-from romm import RomM
+# The archive contains a RomM folder with the contents inside
+# We want to extract to the folder above the current one so it overwrites our application correctly
+update_path = os.path.abspath(os.path.join(base_path, ".."))
+
+# Only the standard library is imported before the app files are known to be
+# from a single version
+from update_installer import UpdateInstaller  # noqa: E402
+
+# Finish an update interrupted while its files were moved into place
+try:
+    UpdateInstaller(update_path).resume()
+except (OSError, ValueError) as e:
+    print(f"Failed to finish interrupted update: {e}", file=sys.stderr)
+
+from startup_trace import StartupTrace  # noqa: E402
+
+startup = StartupTrace()
 
 
 def apply_pending_update():
-    # The archive contains a RomM folder with the contents inside
-    # We want to extract to the folder above the current one so it overwrites our application correctly
-    update_path = os.path.abspath(os.path.join(base_path, ".."))
     update_files = [f for f in os.listdir(base_path) if f.endswith(".muxapp")]
     if not update_files:
         return False
 
     update_file = os.path.join(base_path, update_files[0])
     try:
-        with zipfile.ZipFile(update_file, "r") as zip_ref:
-            zip_ref.extractall(update_path)
+        # Only the files that changed since the installed version are written
+        UpdateInstaller(update_path).install(update_file)
         os.remove(update_file)
 
         sys.stdout.close()
         sys.exit(0)
-    except (zipfile.BadZipFile, OSError) as e:
+    except (zipfile.BadZipFile, OSError, ValueError) as e:
         print(f"Failed to apply update: {e}", file=sys.stderr)
         return False
 
 
-# Check for update before initializing since it may overwrite our dependencies
-if not apply_pending_update():
+# Check for update before importing the app since it may overwrite it and our
+# dependencies
+with startup.step("apply_pending_update"):
+    update_applied = apply_pending_update()
+
+with startup.step("import sdl2"):
+    import sdl2
+with startup.step("import dotenv"):
+    from dotenv import load_dotenv
+with startup.step("import config, frame_scheduler, metrics, platform_maps"):
+    from config import set_controller_layout
+    from frame_scheduler import FrameScheduler
+    from metrics import Metrics
+    from platform_maps import init_env_maps
+
+# The app modules build their singletons when imported, so .env is loaded first
+if not update_applied:
     # Throw an error if the .env file is not found
     if not os.path.exists(os.path.join(os.path.dirname(__file__), ".env")):
         raise FileNotFoundError("The .env file is missing!")
 
-    load_dotenv(os.path.join(os.path.dirname(__file__), ".env"))
-    set_controller_layout(os.getenv("CONTROLLER_LAYOUT", "nintendo"))
+    with startup.step("load .env"):
+        load_dotenv(os.path.join(os.path.dirname(__file__), ".env"))
+        set_controller_layout(os.getenv("CONTROLLER_LAYOUT", "nintendo"))
 
     # Set up logging
     log_file = os.environ.get("LOG_FILE", "./logs/log.txt")
@@ -52,10 +78,18 @@ if not apply_pending_update():
     sys.stdout = open(log_file, "w", buffering=1)
 
     # Read any custom maps
-    init_env_maps()
+    with startup.step("init_env_maps"):
+        init_env_maps()
+
+with startup.step("import romm"):
+    from romm import RomM
 
 
-def cleanup(romm: RomM, exit_code: int):
+def cleanup(romm: RomM, scheduler: FrameScheduler, exit_code: int):
+    scheduler.cleanup()
+    romm.save_snapshot()
+    Metrics().flush()
+    romm.api.asset_pipeline.cleanup()
     romm.ui.cleanup()
     romm.input.cleanup()
 
@@ -65,28 +99,63 @@ def cleanup(romm: RomM, exit_code: int):
 
 def main():
     # Initialize SDL2 with video and joystick support
-    if sdl2.SDL_Init(sdl2.SDL_INIT_VIDEO | sdl2.SDL_INIT_GAMECONTROLLER) < 0:
-        print(f"SDL2 initialization failed: {sdl2.SDL_GetError()}")
-        sys.exit(1)
-
-    romm = RomM()
-    romm.start()
+    with startup.step("SDL_Init"):
+        if sdl2.SDL_Init(sdl2.SDL_INIT_VIDEO | sdl2.SDL_INIT_GAMECONTROLLER) < 0:
+            print(f"SDL2 initialization failed: {sdl2.SDL_GetError()}")
+            sys.exit(1)
+
+    with startup.step("RomM()"):
+        romm = RomM()
+    scheduler = FrameScheduler()
+    metrics = Metrics()
+    with startup.step("RomM.start"):
+        romm.start()
 
     try:
         while romm.running:
-            romm.ui.draw_start()  # Render at 640x480
-            romm.update()  # Draw content
-            romm.ui.render_to_screen()  # Render to the screen
-            romm.input.clear_pressed()  # Clear pressed keys
-
-            # Add a small sleep to prevent 100% CPU usage
-            sdl2.SDL_Delay(16)
+            frame_start = time.perf_counter()
+            # Skip the frame when nothing changed since the last one
+            redraw = romm.needs_redraw()
+            update_end = time.perf_counter()
+
+            if redraw:
+                romm.ui.draw_start()  # Render at 640x480
+                romm.update()  # Draw content
+                if scheduler.show_overlay:
+                    romm.ui.draw_frame_stats(scheduler.timings.summary())
+                draw_end = time.perf_counter()
+                romm.ui.render_to_screen()  # Render to the screen
+                startup.report()  # Once, after the first frame
+                if romm.status.platforms:
+                    startup.report_interactive(
+                        "platforms from the last session"
+                        if not romm.status.platforms_ready.is_set()
+                        else "platforms fetched"
+                    )
+                romm.input.clear_pressed()  # Clear pressed keys
+                metrics.observe(
+                    "ui.frame_ms", (time.perf_counter() - frame_start) * 1000
+                )
+                scheduler.frame_done(
+                    update_end - frame_start,
+                    draw_end - update_end,
+                    time.perf_counter() - draw_end,
+                )
+            else:
+                scheduler.frame_done(update_end - frame_start)
+
+            # Wait for input until the next frame, longer while nothing moves
+            scheduler.wait(
+                active=romm.ui.frame_is_animated or romm.input.has_activity(),
+                presented=redraw,
+                wait_events=romm.wait_events,
+            )
     except RuntimeError:
-        cleanup(romm, 1)
+        cleanup(romm, scheduler, 1)
 
     # Cleanup
     print("Exiting...")
-    cleanup(romm, 0)
+    cleanup(romm, scheduler, 0)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,140 @@
+import json
+import os
+import threading
+import time
+from contextlib import nullcontext
+from typing import ContextManager, Optional
+
+from config import getenv_number
+
+if os.path.exists(os.path.join(os.path.dirname(__file__), "__version__.py")):
+    from __version__ import version
+else:
+    version = "unknown"
+
+
+class _Timer:
+    def __init__(self, metrics: "Metrics", name: str) -> None:
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self) -> None:
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc_info) -> None:
+        self.metrics.observe(self.name, (time.perf_counter() - self.start) * 1000)
+
+
+class Metrics:
+    """Performance timers and counters, written to METRICS_FILE as JSON lines.
+
+    observe() records a value (timer() records milliseconds), count() adds to
+    a counter, both only append under a lock. Every METRICS_ROLLUP_SECONDS a
+    daemon thread, and flush() on exit, appends one line per name with the
+    count, total and distribution of its values since the previous rollup,
+    along with the app version so the files of different builds can be
+    compared. While METRICS_FILE is unset every call returns right away.
+
+    The settings are read on first use rather than when the instance is
+    built, since modules imported before .env is loaded already hold it.
+    """
+
+    _instance: Optional["Metrics"] = None
+    _initialized: bool = False
+
+    def __new__(cls):
+        if not cls._instance:
+            cls._instance = super(Metrics, cls).__new__(cls)
+        return cls._instance
+
+    def __init__(self) -> None:
+        if self._initialized:
+            return
+
+        self.path = ""
+        # None until the settings are read
+        self.enabled: bool | None = None
+        self.rollup_period = 60.0
+        self._values: dict[str, list[float]] = {}
+        self._counters: dict[str, float] = {}
+        self._lock = threading.Lock()
+        # The rollup thread and the flush on exit may write at the same time
+        self._write_lock = threading.Lock()
+        self._initialized = True
+
+    def _is_enabled(self) -> bool:
+        if self.enabled is None:
+            with self._lock:
+                if self.enabled is None:
+                    self._configure()
+        return self.enabled
+
+    def _configure(self) -> None:
+        self.path = os.getenv("METRICS_FILE", "")
+        self.rollup_period = max(1.0, getenv_number("METRICS_ROLLUP_SECONDS", 60))
+        # Rollups are encoded and written off the threads being measured
+        if self.path:
+            threading.Thread(target=self._run, daemon=True).start()
+        self.enabled = bool(self.path)
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(self.rollup_period)
+            self.flush()
+
+    def timer(self, name: str) -> ContextManager[None]:
+        if not self._is_enabled():
+            return nullcontext()
+        return _Timer(self, name)
+
+    def observe(self, name: str, value: float) -> None:
+        if not self._is_enabled():
+            return
+        with self._lock:
+            self._values.setdefault(name, []).append(value)
+
+    def count(self, name: str, value: float = 1) -> None:
+        if not self._is_enabled():
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def flush(self) -> None:
+        if not self._is_enabled():
+            return
+        with self._lock:
+            values, self._values = self._values, {}
+            counters, self._counters = self._counters, {}
+        if not values and not counters:
+            return
+
+        timestamp = round(time.time(), 3)
+        lines = []
+        for name, samples in sorted(values.items()):
+            samples.sort()
+            lines.append(
+                {
+                    "time": timestamp,
+                    "version": version,
+                    "name": name,
+                    "count": len(samples),
+                    "total": round(sum(samples), 3),
+                    "min": round(samples[0], 3),
+                    "mean": round(sum(samples) / len(samples), 3),
+                    "p50": round(samples[len(samples) // 2], 3),
+                    "p95": round(samples[int(len(samples) * 0.95)], 3),
+                    "max": round(samples[-1], 3),
+                }
+            )
+        for name, total in sorted(counters.items()):
+            lines.append(
+                {"time": timestamp, "version": version, "name": name, "total": total}
+            )
+
+        with self._write_lock:
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                with open(self.path, "a") as f:
+                    f.writelines(json.dumps(line) + "\n" for line in lines)
+            except OSError as e:
+                print(f"Error writing metrics: {e}")
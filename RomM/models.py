@@ -1,7 +1,37 @@
+import math
+import sys
 from collections import namedtuple
+from typing import Any, Iterable, Optional, Tuple
 
-Rom = namedtuple(
-    "Rom",
+_SIZE_NAMES = ("B", "KB", "MB", "GB")
+
+
+def human_readable_size(size_bytes: int) -> Tuple[float, str]:
+    if size_bytes == 0:
+        return 0, "B"
+    i = int(math.floor(math.log(size_bytes, 1024)))
+    p = math.pow(1024, i)
+    s = round(size_bytes / p, 2)
+    return (s, _SIZE_NAMES[i])
+
+
+def intern_str(value: Optional[str]) -> Optional[str]:
+    """Intern a string that repeats across many ROMs (slugs, extensions...)."""
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def intern_tuple(values: Optional[Iterable[str]]) -> Tuple[str, ...]:
+    """Freeze a list of repeated labels into a tuple of interned strings.
+
+    Empty or missing lists all share the empty tuple singleton.
+    """
+    if not values:
+        return ()
+    return tuple(sys.intern(v) if isinstance(v, str) else v for v in values)
+
+
+_RomFields = namedtuple(
+    "_RomFields",
     [
         "id",
         "platform_id",
@@ -10,7 +40,6 @@ Rom = namedtuple(
         "fs_name_no_tags",
         "fs_name_no_ext",
         "fs_extension",
-        "fs_size",
         "fs_size_bytes",
         "name",
         "slug",
@@ -40,5 +69,78 @@ Rom = namedtuple(
         "average_rating",
     ],
 )
+
+
+class Rom(_RomFields):
+    # No per-instance __dict__, a Rom costs exactly one tuple
+    __slots__ = ()
+
+    @property
+    def fs_size(self) -> Tuple[float, str]:
+        """Human readable size, computed on demand instead of stored per ROM."""
+        return human_readable_size(self.fs_size_bytes)
+
+    # Keys of an api/roms item from_api can't do without
+    api_keys = frozenset(
+        (
+            "id",
+            "platform_id",
+            "platform_slug",
+            "fs_name",
+            "fs_name_no_tags",
+            "fs_name_no_ext",
+            "fs_extension",
+            "fs_size_bytes",
+            "name",
+            "slug",
+            "summary",
+            "path_cover_small",
+            "path_cover_large",
+            "is_identified",
+        )
+    )
+
+    @classmethod
+    def from_api(cls, rom: dict[str, Any]) -> "Rom":
+        """Build a Rom from an item of the api/roms payload."""
+        metadatum = rom.get("metadatum", {})
+        return cls(
+            id=rom["id"],
+            platform_id=rom["platform_id"],
+            platform_slug=intern_str(rom["platform_slug"]),
+            fs_name=rom["fs_name"],
+            fs_name_no_tags=rom["fs_name_no_tags"],
+            fs_name_no_ext=rom["fs_name_no_ext"],
+            fs_extension=intern_str(rom["fs_extension"]),
+            fs_size_bytes=rom["fs_size_bytes"],
+            name=rom["name"],
+            slug=rom["slug"],
+            summary=rom["summary"],
+            youtube_video_id=rom.get("youtube_video_id", None),
+            path_cover_small=rom["path_cover_small"],
+            path_cover_large=rom["path_cover_large"],
+            is_identified=rom["is_identified"],
+            revision=intern_str(rom.get("revision", None)),
+            regions=intern_tuple(rom.get("regions")),
+            languages=intern_tuple(rom.get("languages")),
+            tags=intern_tuple(rom.get("tags")),
+            crc_hash=rom.get("crc_hash", ""),
+            md5_hash=rom.get("md5_hash", ""),
+            sha1_hash=rom.get("sha1_hash", ""),
+            has_simple_single_file=rom.get("has_simple_single_file", False),
+            has_nested_single_file=rom.get("has_nested_single_file", False),
+            has_multiple_files=rom.get("has_multiple_files", False),
+            merged_screenshots=tuple(rom.get("merged_screenshots") or ()),
+            genres=intern_tuple(metadatum.get("genres")),
+            franchises=intern_tuple(metadatum.get("franchises")),
+            collections=intern_tuple(metadatum.get("collections")),
+            companies=intern_tuple(metadatum.get("companies")),
+            game_modes=intern_tuple(metadatum.get("game_modes")),
+            age_ratings=intern_tuple(metadatum.get("age_ratings")),
+            first_release_date=metadatum.get("first_release_date", None),
+            average_rating=metadatum.get("average_rating", None),
+        )
+
+
 Collection = namedtuple("Collection", ["id", "name", "rom_count", "virtual"])
 Platform = namedtuple("Platform", ["id", "display_name", "slug", "rom_count"])
@@ -0,0 +1,353 @@
+import threading
+import unicodedata
+from array import array
+from typing import Any, Callable, Iterable, Iterator, Optional, Sequence, overload
+
+from models import Rom
+
+# Numeric columns, stored as packed 64 bit integers
+_INT_COLUMNS = ("id", "platform_id", "fs_size_bytes")
+
+# Boolean columns, stored as packed bytes
+_FLAG_COLUMNS = (
+    "is_identified",
+    "has_simple_single_file",
+    "has_nested_single_file",
+    "has_multiple_files",
+)
+
+# Low cardinality columns, stored as an index into a pool of unique values.
+# The metadata label tuples (genres, companies...) are left out: their
+# combinations are close to unique per ROM, and pooling them costs more than
+# the one reference per row of a plain list
+_POOLED_COLUMNS = (
+    "platform_slug",
+    "fs_extension",
+    "revision",
+    "regions",
+    "languages",
+    "tags",
+)
+
+_INT, _FLAG, _POOLED, _OBJECT = range(4)
+
+# Pool codes use the smallest of these that fits the pool, with its limit
+_CODE_TYPES = (("B", 1 << 8), ("H", 1 << 16), ("I", 1 << 32))
+
+
+def _code_limit(typecode: str) -> int:
+    return dict(_CODE_TYPES)[typecode]
+
+
+def _column_kind(field: str) -> int:
+    if field in _INT_COLUMNS:
+        return _INT
+    if field in _FLAG_COLUMNS:
+        return _FLAG
+    if field in _POOLED_COLUMNS:
+        return _POOLED
+    return _OBJECT
+
+
+class RomTable(Sequence[Rom]):
+    """Column oriented storage for a list of ROMs.
+
+    Behaves like a read-only list of Rom, but keeps every field in its own
+    column: numbers and flags in packed arrays, repeated values in shared
+    pools and the remaining strings in plain lists. Rom rows are only built
+    when indexed, so drawing a page of the list only materializes that page.
+    """
+
+    def __init__(self, roms: Iterable[Rom] = ()) -> None:
+        # Number of rows decoded into the columns
+        self._length = 0
+        # Number of rows, decoded or not. Only changes when rows are added, so
+        # len() is right while another thread decodes pending items
+        self._total = 0
+        # Raw api/roms items not decoded yet, see from_payload
+        self._pending: list[Optional[dict[str, Any]]] = []
+        self._pending_start = 0
+        self._pending_lock = threading.Lock()
+
+        self._columns: dict[str, Any] = {}
+        self._pools: dict[str, list[Any]] = {}
+        self._pool_codes: dict[str, dict[Any, int]] = {}
+
+        for field in Rom._fields:
+            kind = _column_kind(field)
+            if kind == _INT:
+                self._columns[field] = array("q")
+            elif kind in (_FLAG, _POOLED):
+                self._columns[field] = array("B")
+            else:
+                self._columns[field] = []
+            if kind == _POOLED:
+                self._pools[field] = []
+                self._pool_codes[field] = {}
+
+        self._layout = self._build_layout()
+
+        for rom in roms:
+            self.append(rom)
+
+    @classmethod
+    def from_payload(cls, items: list[dict[str, Any]]) -> "RomTable":
+        """Build a table from api/roms items, decoding them on first access.
+
+        Items are only turned into columns up to the highest row read, so the
+        first page of a big list is ready without decoding the whole payload.
+        Full scans (iteration, filters, sorting) decode the rest.
+        """
+        table = cls()
+        # Checked here, not on whichever thread first decodes the item
+        table._pending = [item for item in items if Rom.api_keys.issubset(item)]
+        if len(table._pending) < len(items):
+            print(
+                f"Ignoring {len(items) - len(table._pending)} ROMs "
+                "missing required fields"
+            )
+        table._total = len(table._pending)
+        return table
+
+    def _load(self, count: Optional[int] = None) -> None:
+        """Decode pending payload items until `count` rows (or all) are in columns."""
+        if not self._pending:
+            return
+
+        with self._pending_lock:
+            pending = self._pending
+            end = len(pending)
+            if count is not None:
+                end = min(end, self._pending_start + max(0, count - self._length))
+
+            for i in range(self._pending_start, end):
+                item = pending[i]
+                pending[i] = None  # Let the decoded payload item be freed
+                self._append(Rom.from_api(item))  # type: ignore
+            self._pending_start = max(self._pending_start, end)
+
+            if self._pending_start >= len(pending):
+                self._pending = []
+                self._pending_start = 0
+
+    def _build_layout(self) -> list[tuple[Any, int, Any, Any]]:
+        # Per field (column, kind, pool, pool codes), in Rom field order
+        return [
+            (
+                self._columns[field],
+                _column_kind(field),
+                self._pools.get(field),
+                self._pool_codes.get(field),
+            )
+            for field in Rom._fields
+        ]
+
+    def _row(self, index: int) -> Rom:
+        values = []
+        for column, kind, pool, _codes in self._layout:
+            if kind == _POOLED:
+                values.append(pool[column[index]])  # type: ignore
+            elif kind == _FLAG:
+                values.append(column[index] == 1)
+            else:
+                values.append(column[index])
+        return Rom._make(values)
+
+    ###
+    # MUTATION
+    ###
+
+    def append(self, rom: Rom) -> None:
+        self._load()
+        self._append(rom)
+        self._total += 1
+
+    def _append(self, rom: Rom) -> None:
+        for (column, kind, pool, codes), value in zip(self._layout, rom, strict=True):
+            if kind == _POOLED:
+                code = codes.get(value)
+                if code is None:
+                    code = codes[value] = len(pool)
+                    pool.append(value)
+                    if code >= _code_limit(column.typecode):
+                        column = self._widen(column)
+                column.append(code)
+            elif kind == _FLAG:
+                column.append(1 if value else 0)
+            elif kind == _INT:
+                column.append(value or 0)
+            else:
+                column.append(value)
+        self._length += 1
+
+    def _widen(self, column: array) -> array:
+        """Replace a pooled column with one using the next larger code type."""
+        typecodes = [typecode for typecode, _limit in _CODE_TYPES]
+        wider = array(typecodes[typecodes.index(column.typecode) + 1], column)
+        for field, current in self._columns.items():
+            if current is column:
+                self._columns[field] = wider
+        self._layout = self._build_layout()
+        return wider
+
+    def extend(self, roms: Iterable[Rom]) -> None:
+        for rom in roms:
+            self.append(rom)
+
+    ###
+    # SEQUENCE PROTOCOL
+    ###
+
+    def __len__(self) -> int:
+        return self._total
+
+    @overload
+    def __getitem__(self, index: int) -> Rom: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[Rom]: ...
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            rows = range(*index.indices(len(self)))
+            if rows:
+                self._load(max(rows[0], rows[-1]) + 1)
+            return [self._row(i) for i in rows]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("RomTable index out of range")
+        self._load(index + 1)
+        return self._row(index)
+
+    def __iter__(self) -> Iterator[Rom]:
+        for i in range(len(self)):
+            self._load(i + 1)
+            yield self._row(i)
+
+    def copy(self) -> list[Rom]:
+        """Materialize every row into a plain list, like list.copy()."""
+        return list(self)
+
+    ###
+    # COLUMN ACCESS
+    ###
+
+    def column(self, field: str) -> Sequence[Any]:
+        """Return the values of a single column without building any row.
+
+        Integer and flag columns are returned as the backing array, pooled
+        columns are decoded. The result must not be modified.
+        """
+        self._load()
+        column = self._columns[field]
+        if field in self._pools:
+            pool = self._pools[field]
+            return [pool[code] for code in column]
+        return column
+
+    def take(self, indices: Iterable[int]) -> "RomTable":
+        """Build a new table from the rows at the given indices."""
+        self._load()
+        # The new table shares the (append only) pools with this one
+        table = RomTable()
+        table._pools = self._pools
+        table._pool_codes = self._pool_codes
+
+        indices = list(indices)
+        for field, column in self._columns.items():
+            if isinstance(column, array):
+                # Same type as the source, pool codes may need more than a byte
+                table._columns[field] = array(
+                    column.typecode, (column[i] for i in indices)
+                )
+            else:
+                table._columns[field].extend(column[i] for i in indices)
+        table._layout = table._build_layout()
+        table._length = table._total = len(indices)
+        return table
+
+    def where(
+        self,
+        fields: str | tuple[str, ...],
+        predicate: Callable[..., bool],
+    ) -> "RomTable":
+        """Return the rows whose column values satisfy the predicate.
+
+        The predicate is called with the values of the given fields, in order.
+        When filtering on a single pooled column it is evaluated once per
+        unique value instead of once per row.
+        """
+        if isinstance(fields, str):
+            fields = (fields,)
+
+        self._load()
+        if len(fields) == 1 and fields[0] in self._pools:
+            codes = self._columns[fields[0]]
+            matches = [predicate(value) for value in self._pools[fields[0]]]
+            return self.take(i for i in range(self._length) if matches[codes[i]])
+
+        columns = [self.column(field) for field in fields]
+        return self.take(
+            i
+            for i in range(self._length)
+            if predicate(*(column[i] for column in columns))
+        )
+
+    def sorted_by(self, field: str, reverse: bool = False) -> "RomTable":
+        """Return a new table ordered by a single column."""
+        column = self.column(field)
+        return self.take(
+            sorted(range(self._length), key=column.__getitem__, reverse=reverse)
+        )
+
+
+def _first_letter(name: str | None) -> str:
+    """Upper case first letter of a name without accents, "#" for anything else."""
+    first = unicodedata.normalize("NFKD", name[:1])[:1].upper() if name else ""
+    return first if first.isalpha() else "#"
+
+
+class LetterIndex:
+    """Start position of each run of names sharing the same first letter.
+
+    Built in a single pass over a name column, after which jumping to the
+    next or previous letter from any position is a couple of lookups.
+    """
+
+    def __init__(self, names: Iterable[str | None]) -> None:
+        self.starts: list[int] = []
+        self.letters: list[str] = []
+        # Letter run of every position
+        self._runs = array("L")
+        for name in names:
+            letter = _first_letter(name)
+            if not self.letters or letter != self.letters[-1]:
+                self.starts.append(len(self._runs))
+                self.letters.append(letter)
+            self._runs.append(len(self.letters) - 1)
+
+    def __len__(self) -> int:
+        return len(self._runs)
+
+    def _run(self, position: int) -> int:
+        # Positions past either end belong to the first or last letter
+        return self._runs[min(max(position, 0), len(self._runs) - 1)]
+
+    def letter(self, position: int) -> str:
+        return self.letters[self._run(position)] if self._runs else ""
+
+    def next(self, position: int) -> int:
+        """Start of the letter after the one at position, wrapping around."""
+        if not self._runs:
+            return position
+        return self.starts[(self._run(position) + 1) % len(self.starts)]
+
+    def previous(self, position: int) -> int:
+        """Start of the letter at position, or of the one before if already there."""
+        if not self._runs:
+            return position
+        run = self._run(position)
+        if position == self.starts[run]:
+            run -= 1
+        return self.starts[run % len(self.starts)]
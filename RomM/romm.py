@@ -1,11 +1,15 @@
+import ctypes
 import os
 import threading
 import time
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
 import sdl2
-import sdl2.ext
-from models import Rom
+from models import Collection, Platform, Rom
+from rom_table import LetterIndex, RomTable
+from search import GlobalSearch, SearchIndex
+from startup_trace import StartupTrace
+from state_snapshot import StateSnapshot
 
 if os.path.exists(os.path.join(os.path.dirname(__file__), "__version__.py")):
     from __version__ import version
@@ -13,6 +17,7 @@ else:
     version = "unknown"
 
 from api import API
+from catalogue_builder import CatalogueBuilder
 from config import (
     BUTTON_CONFIGS,
     get_controller_layout,
@@ -33,6 +38,15 @@ from update import Update
 ButtonConfig = Dict[str, str]
 
 
+# Keys of the on-screen keyboard of the ROM search
+SEARCH_KEYBOARD_ROWS = (
+    tuple("1234567890"),
+    tuple("ABCDEFGHIJ"),
+    tuple("KLMNOPQRST"),
+    (*"UVWXYZ", "Space", "Del", "Done"),
+)
+
+
 class StartMenuOptions:
     ABORT_DOWNLOAD = f"{glyphs.abort} Abort downloads"
     SD_SWITCH = f"{glyphs.microsd} Switch SD card"
@@ -44,13 +58,20 @@ class RomM:
     running: bool = True
     spinner_speed = 0.05
 
+    # Max seconds the update check waits for the RomM API fetches at startup
+    update_check_delay = 10
+
     def __init__(self) -> None:
-        self.api = API()
+        startup = StartupTrace()
+        with startup.step("API"):
+            self.api = API()
         self.fs = Filesystem()
-        self.input = Input()
+        with startup.step("Input"):
+            self.input = Input()
         self.status = Status()
-        self.ui = UserInterface()
-        self.updater = Update(self.ui)
+        with startup.step("UserInterface"):
+            self.ui = UserInterface()
+        self.updater = Update()
 
         self.contextual_menu_options: list[Tuple[str, int, Any]] = []
         self.start_menu_selected_position = 0
@@ -68,10 +89,35 @@ class RomM:
         self.last_spinner_update = time.time()
         self.current_spinner_status = next(glyphs.spinner)
 
+        # State the last frame was drawn from, see needs_redraw
+        self._last_frame_state: Optional[tuple] = None
+
+        # Inputs status.roms_to_show was last filtered from, see _filter_roms
+        self._filtered_roms: Optional[RomTable] = None
+        self._filter_key: Optional[tuple] = None
+        # First letter index over status.roms_to_show, built on the first jump
+        self._letter_index: Optional[LetterIndex] = None
+        self._jump_letter = ""
+        self._jump_letter_until = 0.0
+        self.jump_letter_duration = 0.6
+        # Name index over status.roms, built when the search is first opened
+        self._search_index: Optional[SearchIndex] = None
+        self._search_index_roms: Optional[RomTable] = None
+        self.search_keyboard_row = 0
+        self.search_keyboard_col = 0
+        # Searches the whole library, results replace status.roms
+        self.library_search = GlobalSearch(self.api)
+        self.catalogue_builder = CatalogueBuilder(self.api)
+        # Lists and cursor of the last session, see _restore_snapshot
+        self.snapshot = StateSnapshot()
+        # Lists the cursors were last placed in, see _follow_selection
+        self._cursor_platforms: list[Platform] = []
+        self._cursor_collections: list[Collection] = []
+
         # Set update variables
         self.awaiting_input = False
         self.latest_version = None
-        self.download_url = None
+        self.update_asset: Optional[dict] = None
 
         # Set start menu options
         self.start_menu_options = [
@@ -85,6 +131,20 @@ class RomM:
         ]
 
     def draw_buttons(self):
+        # The legend only changes with the buttons, draw it as a cached layer
+        self.ui.draw_layer(
+            (
+                "buttons",
+                tuple(
+                    (config["key"], config["label"], config["color"])
+                    for config in self.buttons_config
+                ),
+            ),
+            (0, 440, self.ui.screen_width, self.ui.screen_height),
+            self._draw_buttons_legend,
+        )
+
+    def _draw_buttons_legend(self):
         # Button rendering with adjusted spacing
         pos_x = 20  # Starting x position
         radius = 20  # Diameter of button circle
@@ -104,6 +164,16 @@ class RomM:
             pos_x += total_width + padding
 
     def _check_for_updates(self):
+        # Let the RomM API requests of the first frames go first, up to a
+        # few seconds
+        deadline = time.time() + self.update_check_delay
+        for ready in (
+            self.status.platforms_ready,
+            self.status.collections_ready,
+            self.status.me_ready,
+        ):
+            ready.wait(max(0.0, deadline - time.time()))
+
         # Get latest release from GitHub API
         release_info = self.updater.get_latest_release_info()
 
@@ -116,13 +186,13 @@ class RomM:
             return
 
         latest_version = latest_tag.lstrip("v")
-        download_url = None
+        update_asset = None
         for asset in release_info.get("assets", []):
             if "browser_download_url" in asset:
-                download_url = asset["browser_download_url"]
+                update_asset = asset
                 break
 
-        if not download_url:
+        if not update_asset:
             print("Failed to find download URL")
             return
 
@@ -133,7 +203,7 @@ class RomM:
             self.ui.draw_clear()
             self.status.updating.set()
             self.latest_version = latest_version
-            self.download_url = download_url
+            self.update_asset = update_asset
             self.awaiting_input = True
 
     def _handle_update_confirmation(self):
@@ -169,41 +239,66 @@ class RomM:
             if self.input.key(self.controller_layout["a"]["key"]):
                 self.awaiting_input = False
                 self.ui.draw_clear()
-                if self.updater.download_update(self.download_url):
-                    self.ui.draw_log(
-                        text_line_1="Update downloaded successfully!",
-                        text_line_2="App will now exit...",
-                    )
-                    self.ui.render_to_screen()
-                    sdl2.SDL_Delay(1000)
-                    raise SystemExit
-                else:
-                    self.ui.draw_log(text_line_1="Update failed")
-                self.ui.render_to_screen()
-                sdl2.SDL_Delay(1000)
-                self.status.updating.clear()
+                self.updater.start_download(self.update_asset)
             elif self.input.key(self.controller_layout["b"]["key"]):
                 self.awaiting_input = False
                 self.status.updating.clear()
                 self.ui.draw_clear()
 
+    def _render_update_download(self):
+        # The download runs on a thread, the main loop only draws its progress
+        if self.updater.downloading:
+            self.ui.draw_loader(self.updater.download_percent)
+            self.ui.draw_log(
+                text_line_1="Downloading update...",
+                text_line_2=f"{self.updater.download_percent:.2f} / 100 % | ( {glyphs.download} v{self.latest_version})",
+                background=True,
+            )
+            return
+
+        if self.updater.download_result:
+            self.ui.draw_log(
+                text_line_1="Update downloaded successfully!",
+                text_line_2="App will now exit...",
+            )
+            self.ui.render_to_screen()
+            sdl2.SDL_Delay(1000)
+            raise SystemExit
+        self.ui.draw_log(text_line_1="Update failed")
+        self.ui.render_to_screen()
+        sdl2.SDL_Delay(1000)
+        self.updater.download_result = None
+        self.status.updating.clear()
+
     def _render_platforms_view(self):
         if self.status.updating.is_set():
             return
 
-        if self.status.platforms_ready.is_set():
+        if self.status.platforms is not self._cursor_platforms:
+            self.platforms_selected_position = self._follow_selection(
+                self._cursor_platforms,
+                self.status.platforms,
+                self.platforms_selected_position,
+            )
+            self._cursor_platforms = self.status.platforms
+
+        # Platforms of the last session are shown while they are fetched again
+        if self.status.platforms_ready.is_set() or self.status.platforms:
             self.ui.draw_platforms_list(
                 self.platforms_selected_position,
                 self.max_n_platforms,
                 self.status.platforms,
             )
         if not self.status.platforms_ready.is_set():
+            self.ui.frame_is_animated = True
             current_time = time.time()
             if current_time - self.last_spinner_update >= self.spinner_speed:
                 self.last_spinner_update = current_time
                 self.current_spinner_status = next(glyphs.spinner)
             self.ui.draw_log(
-                text_line_1=f"{self.current_spinner_status} Fetching platforms"
+                text_line_1=f"{self.current_spinner_status} "
+                + ("Refreshing" if self.status.platforms else "Fetching")
+                + " platforms"
             )
         elif not self.status.download_rom_ready.is_set():
             if self.status.extracting_rom and self.status.downloading_rom:
@@ -223,6 +318,8 @@ class RomM:
                     text_line_2=f"({self.status.downloading_rom.fs_name})",
                     background=False,
                 )
+        elif not self.status.catalogue_ready.is_set():
+            self._render_catalogue_progress()
         elif not self.status.valid_host:
             self.ui.draw_log(
                 text_line_1=f"Error: Can't connect to host {self.api.host}",
@@ -259,7 +356,7 @@ class RomM:
         if self.input.key(self.controller_layout["a"]["key"]):
             if self.status.roms_ready.is_set() and len(self.status.platforms) > 0:
                 self.status.roms_ready.clear()
-                self.status.roms = []
+                self.status.reset_roms_list()
                 self.status.selected_platform = self.status.platforms[
                     self.platforms_selected_position
                 ]
@@ -282,6 +379,12 @@ class RomM:
                             text_line_1=f"Platform name: {self.status.platforms[self.platforms_selected_position].display_name}"
                         ),
                     ),
+                    (f"{glyphs.host} Search all ROMs", 1, self._open_global_search),
+                    (
+                        f"{glyphs.cloud_sync} Rebuild catalogue",
+                        2,
+                        self.catalogue_builder.start,
+                    ),
                 ]
             else:
                 self.contextual_menu_options = []
@@ -297,7 +400,15 @@ class RomM:
                 )
 
     def _render_collections_view(self):
-        if self.status.collections_ready.is_set():
+        if self.status.collections is not self._cursor_collections:
+            self.collections_selected_position = self._follow_selection(
+                self._cursor_collections,
+                self.status.collections,
+                self.collections_selected_position,
+            )
+            self._cursor_collections = self.status.collections
+
+        if self.status.collections_ready.is_set() or self.status.collections:
             self.ui.draw_collections_list(
                 self.collections_selected_position,
                 self.max_n_collections,
@@ -305,12 +416,15 @@ class RomM:
                 fill=self.controller_layout["b"]["color"],
             )
         if not self.status.collections_ready.is_set():
+            self.ui.frame_is_animated = True
             current_time = time.time()
             if current_time - self.last_spinner_update >= self.spinner_speed:
                 self.last_spinner_update = current_time
                 self.current_spinner_status = next(glyphs.spinner)
             self.ui.draw_log(
-                text_line_1=f"{self.current_spinner_status} Fetching collections"
+                text_line_1=f"{self.current_spinner_status} "
+                + ("Refreshing" if self.status.collections else "Fetching")
+                + " collections"
             )
         elif not self.status.download_rom_ready.is_set():
             if self.status.extracting_rom and self.status.downloading_rom:
@@ -330,6 +444,8 @@ class RomM:
                     text_line_2=f"({self.status.downloading_rom.fs_name})",
                     background=False,
                 )
+        elif not self.status.catalogue_ready.is_set():
+            self._render_catalogue_progress()
         elif not self.status.valid_host:
             self.ui.draw_log(
                 text_line_1=f"Error: Can't connect to host {self.api.host}",
@@ -366,7 +482,7 @@ class RomM:
         if self.input.key(self.controller_layout["a"]["key"]):
             if self.status.roms_ready.is_set() and len(self.status.collections) > 0:
                 self.status.roms_ready.clear()
-                self.status.roms = []
+                self.status.reset_roms_list()
                 selected_collection = self.status.collections[
                     self.collections_selected_position
                 ]
@@ -404,7 +520,11 @@ class RomM:
             )
 
     def _render_roms_view(self):
-        if len(self.status.roms) == 0 and self.status.roms_ready.is_set():
+        if self.status.global_search:
+            header_text = "All platforms"
+            header_color = self.controller_layout["a"]["color"]
+            prepend_platform_slug = True
+        elif len(self.status.roms) == 0 and self.status.roms_ready.is_set():
             header_text = "No ROMs available"
             header_color = self.controller_layout["a"]["color"]
             prepend_platform_slug = False
@@ -433,16 +553,9 @@ class RomM:
 
         if len(self.status.multi_selected_roms) > 0:
             header_text += f" ({len(self.status.multi_selected_roms)} selected)"
-        if self.status.current_filter == Filter.ALL:
-            self.status.roms_to_show = self.status.roms
-        elif self.status.current_filter == Filter.LOCAL:
-            self.status.roms_to_show = [
-                r for r in self.status.roms if self.fs.is_rom_in_device(r)
-            ]
-        elif self.status.current_filter == Filter.REMOTE:
-            self.status.roms_to_show = [
-                r for r in self.status.roms if not self.fs.is_rom_in_device(r)
-            ]
+        if self.status.search_query:
+            header_text += f' "{self.status.search_query}"'
+        self._filter_roms()
 
         self.ui.draw_roms_list(
             self.roms_selected_position,
@@ -454,7 +567,22 @@ class RomM:
             prepend_platform_slug=prepend_platform_slug,
         )
 
+        if time.time() < self._jump_letter_until:
+            self.ui.frame_is_animated = True
+            self.ui.draw_jump_letter(self._jump_letter)
+
+        if self.status.show_search_keyboard:
+            self.ui.draw_search_keyboard(
+                self.status.search_query,
+                len(self.status.roms_to_show),
+                SEARCH_KEYBOARD_ROWS,
+                self.search_keyboard_row,
+                self.search_keyboard_col,
+                fill=self.controller_layout["a"]["color"],
+            )
+
         if not self.status.roms_ready.is_set():
+            self.ui.frame_is_animated = True
             current_time = time.time()
             if current_time - self.last_spinner_update >= self.spinner_speed:
                 self.last_spinner_update = current_time
@@ -478,6 +606,8 @@ class RomM:
                     text_line_2=f"({self.status.downloading_rom.fs_name})",
                     background=False,
                 )
+        elif not self.status.catalogue_ready.is_set():
+            self._render_catalogue_progress()
         elif not self.status.valid_host:
             self.ui.draw_log(
                 text_line_1=f"Error: Can't connect to host {self.api.host}",
@@ -490,6 +620,25 @@ class RomM:
                 text_color=self.controller_layout["a"]["color"],
             )
             self.status.valid_credentials = True
+        elif self.status.show_search_keyboard:
+            self.buttons_config = [
+                {
+                    "key": self.controller_layout["a"]["btn"],
+                    "label": "Type",
+                    "color": self.controller_layout["a"]["color"],
+                },
+                {
+                    "key": self.controller_layout["b"]["btn"],
+                    "label": "Delete",
+                    "color": self.controller_layout["b"]["color"],
+                },
+                {
+                    "key": "START",
+                    "label": "Done",
+                    "color": self.controller_layout["y"]["color"],
+                },
+            ]
+            self.draw_buttons()
         else:
             self.buttons_config = [
                 {
@@ -538,6 +687,132 @@ class RomM:
             ]
             self.draw_buttons()
 
+    def _filter_roms(self) -> None:
+        """Set status.roms_to_show for the current filter.
+
+        The list is only filtered again when the ROMs, the filter or the
+        ROM files on the device changed since the last time.
+        """
+        filter_key = (
+            self.status.current_filter,
+            self.fs.rom_presence_version,
+            self.status.search_query,
+        )
+        if self.status.roms is self._filtered_roms and filter_key == self._filter_key:
+            return
+
+        roms = self.status.roms
+        if self.status.search_query and not self.status.global_search:
+            roms = roms.take(self._get_search_index().search(self.status.search_query))
+
+        if self.status.current_filter == Filter.ALL:
+            self.status.roms_to_show = roms
+        elif self.status.current_filter == Filter.LOCAL:
+            self.status.roms_to_show = roms.where(
+                ("platform_slug", "fs_name", "has_multiple_files"),
+                self.fs.is_rom_file_in_device,
+            )
+        elif self.status.current_filter == Filter.REMOTE:
+            self.status.roms_to_show = roms.where(
+                ("platform_slug", "fs_name", "has_multiple_files"),
+                lambda *rom_file: not self.fs.is_rom_file_in_device(*rom_file),
+            )
+        self._filtered_roms = self.status.roms
+        self._filter_key = filter_key
+        self._letter_index = None
+        # ROM files removed from the device can shorten the list under the selection
+        self.roms_selected_position = min(
+            self.roms_selected_position, max(0, len(self.status.roms_to_show) - 1)
+        )
+
+    def _get_search_index(self) -> SearchIndex:
+        """Return the name index of status.roms, building it once per list."""
+        if (
+            self._search_index is None
+            or self._search_index_roms is not self.status.roms
+        ):
+            self._search_index = SearchIndex(self.status.roms)
+            self._search_index_roms = self.status.roms
+            print(f"Search index: {self._search_index.stats()}")
+        return self._search_index
+
+    def _open_search(self) -> None:
+        self.status.show_search_keyboard = True
+        self.search_keyboard_row = 0
+        self.search_keyboard_col = 0
+
+    def _open_global_search(self) -> None:
+        self.status.reset_roms_list()
+        self.status.global_search = True
+        self.status.multi_selected_roms = []
+        self.status.current_view = View.ROMS
+        self.roms_selected_position = 0
+        self.library_search.set_query("")
+        self._open_search()
+
+    def _set_search_query(self, query: str) -> None:
+        self.status.search_query = query
+        self.roms_selected_position = 0
+        if self.status.global_search:
+            self.library_search.set_query(query)
+
+    def _update_search_keyboard(self):
+        rows = SEARCH_KEYBOARD_ROWS
+        if self.input.key(self.controller_layout["a"]["key"]):
+            key = rows[self.search_keyboard_row][self.search_keyboard_col]
+            if key == "Done":
+                self.status.show_search_keyboard = False
+            elif key == "Del":
+                self._set_search_query(self.status.search_query[:-1])
+            elif key == "Space":
+                self._set_search_query(self.status.search_query + " ")
+            else:
+                self._set_search_query(self.status.search_query + key.lower())
+        elif self.input.key(self.controller_layout["b"]["key"]):
+            if self.status.search_query:
+                self._set_search_query(self.status.search_query[:-1])
+            else:
+                self.status.show_search_keyboard = False
+        elif self.input.key("START"):
+            self.status.show_search_keyboard = False
+        elif self.input.key("DY+"):
+            self._move_search_keyboard_row(1)
+        elif self.input.key("DY-"):
+            self._move_search_keyboard_row(-1)
+        elif self.input.key("DX+"):
+            self.search_keyboard_col = (self.search_keyboard_col + 1) % len(
+                rows[self.search_keyboard_row]
+            )
+        elif self.input.key("DX-"):
+            self.search_keyboard_col = (self.search_keyboard_col - 1) % len(
+                rows[self.search_keyboard_row]
+            )
+
+    def _move_search_keyboard_row(self, step: int) -> None:
+        rows = SEARCH_KEYBOARD_ROWS
+        self.search_keyboard_row = (self.search_keyboard_row + step) % len(rows)
+        # Stay on the same side of a shorter row
+        self.search_keyboard_col = min(
+            self.search_keyboard_col, len(rows[self.search_keyboard_row]) - 1
+        )
+
+    def _jump_to_letter(self, forward: bool) -> None:
+        """Move the ROM selection to the next or previous first letter."""
+        if len(self.status.roms_to_show) == 0:
+            return
+        if self._letter_index is None:
+            self._letter_index = LetterIndex(self.status.roms_to_show.column("name"))
+        if forward:
+            self.roms_selected_position = self._letter_index.next(
+                self.roms_selected_position
+            )
+        else:
+            self.roms_selected_position = self._letter_index.previous(
+                self.roms_selected_position
+            )
+        self._jump_letter = self._letter_index.letter(self.roms_selected_position)
+        self._jump_letter_until = time.time() + self.jump_letter_duration
+
     def _update_roms_view(self):
         if self.input.key(self.controller_layout["a"]["key"]):
             if (
@@ -554,6 +829,10 @@ class RomM:
                 self.status.abort_download.clear()
                 threading.Thread(target=self.api.download_rom).start()
         elif self.input.key(self.controller_layout["b"]["key"]):
+            if self.status.search_query:
+                # Leave the search results before leaving the list
+                self._set_search_query("")
+                return
             if self.status.selected_platform:
                 self.status.current_view = View.PLATFORMS
                 self.status.selected_platform = None
@@ -569,7 +848,10 @@ class RomM:
             self.roms_selected_position = 0
             self.status.multi_selected_roms = []
         elif self.input.key(self.controller_layout["y"]["key"]):
-            if self.status.roms_ready.is_set():
+            if self.status.global_search:
+                self.library_search.refresh()
+                self.status.multi_selected_roms = []
+            elif self.status.roms_ready.is_set():
                 self.status.roms_ready.clear()
                 threading.Thread(target=self.api.fetch_roms).start()
                 self.status.multi_selected_roms = []
@@ -615,6 +897,14 @@ class RomM:
                     )
             else:
                 self.contextual_menu_options = []
+            if self.status.show_contextual_menu and len(self.status.roms) > 0:
+                self.contextual_menu_options.append(
+                    ("Search", len(self.contextual_menu_options), self._open_search)
+                )
+        elif self.input.key("L2"):
+            self._jump_to_letter(forward=False)
+        elif self.input.key("R2"):
+            self._jump_to_letter(forward=True)
         else:
             self.roms_selected_position = self.input.handle_navigation(
                 self.roms_selected_position,
@@ -663,6 +953,15 @@ class RomM:
                 len(self.contextual_menu_options),
             )
 
+    def _render_catalogue_progress(self):
+        done, total = self.status.catalogue_done, self.status.catalogue_total
+        self.ui.draw_loader(done / total * 100 if total else 0.0)
+        self.ui.draw_log(
+            text_line_1=f"{done}/{total} | Rebuilding catalogue",
+            text_line_2=self.status.catalogue_step,
+            background=False,
+        )
+
     def _render_start_menu(self):
         pos = [self.ui.screen_width / 3, self.ui.screen_height / 3]
         padding = 6
@@ -726,6 +1025,7 @@ class RomM:
             selected_pos = self.start_menu_selected_position
             if selected_pos == self.start_menu_options[0][1]:
                 self.status.abort_download.set()
+                self.catalogue_builder.cancel()
                 self.status.show_start_menu = False
             elif selected_pos == self.start_menu_options[1][1]:
                 self.fs.switch_sd_storage()
@@ -770,18 +1070,162 @@ class RomM:
         if self.input.key("START") and not self.status.show_start_menu:
             self.status.show_contextual_menu = not self.status.show_contextual_menu
 
-    def _monitor_input(self):
-        while self.running:
-            events = sdl2.ext.get_events()
-            for event in events:
-                self.input.check_event(event)
-                if event.type == sdl2.SDL_QUIT:
-                    self.running = False
+    def wait_events(self, timeout_ms: int) -> bool:
+        """Handle the SDL events received within timeout_ms, on the main thread.
+
+        Blocks until the first event arrives or the timeout expires, then
+        drains the queue. Returns whether any event was handled.
+        """
+        event = sdl2.SDL_Event()
+        if timeout_ms > 0:
+            received = sdl2.SDL_WaitEventTimeout(ctypes.byref(event), timeout_ms)
+        else:
+            received = sdl2.SDL_PollEvent(ctypes.byref(event))
+
+        handled = False
+        while received:
+            handled = True
+            self.input.check_event(event)
+            if event.type == sdl2.SDL_QUIT:
+                self.running = False
+            received = sdl2.SDL_PollEvent(ctypes.byref(event))
+        return handled
+
+    def _frame_state(self) -> tuple:
+        """Snapshot of everything a frame is drawn from, besides input and time."""
+        return (
+            self.awaiting_input,
+            self.updater.downloading,
+            self.updater.download_percent,
+            self.updater.download_result,
+            self.controller_layout["a"]["color"],
+            self.start_menu_selected_position,
+            self.contextual_menu_selected_position,
+            len(self.contextual_menu_options),
+            self.platforms_selected_position,
+            self.collections_selected_position,
+            self.roms_selected_position,
+            self.fs.get_roms_storage_path(),
+            self.status.current_view,
+            self.status.current_filter,
+            self.status.search_query,
+            self.status.show_search_keyboard,
+            self.search_keyboard_row,
+            self.search_keyboard_col,
+            self.status.selected_platform,
+            self.status.selected_collection,
+            self.status.selected_virtual_collection,
+            self.status.show_start_menu,
+            self.status.show_contextual_menu,
+            self.status.valid_host,
+            self.status.valid_credentials,
+            self.status.me_ready.is_set(),
+            self.status.profile_pic_path,
+            self.status.platforms_ready.is_set(),
+            self.status.collections_ready.is_set(),
+            self.status.roms_ready.is_set(),
+            self.status.download_rom_ready.is_set(),
+            self.status.updating.is_set(),
+            self.status.catalogue_ready.is_set(),
+            self.status.catalogue_step,
+            self.status.catalogue_done,
+            id(self.status.platforms),
+            id(self.status.collections),
+            id(self.status.roms),
+            len(self.status.multi_selected_roms),
+            self.status.downloading_rom,
+            self.status.downloading_rom_position,
+            self.status.downloaded_percent,
+            self.status.extracting_rom,
+            self.status.extracted_percent,
+        )
+
+    def needs_redraw(self) -> bool:
+        """Check if the next frame would differ from the one on screen.
+
+        Frames are only drawn on input, on state changes and while something
+        animates (spinners, marquees), so idle screens don't use the CPU.
+        """
+        frame_state = self._frame_state()
+        if (
+            self.ui.frame_is_animated
+            or self.input.has_activity()
+            or frame_state != self._last_frame_state
+        ):
+            self._last_frame_state = frame_state
+            return True
+        return False
+
+    def _follow_selection(self, previous: list, current: list, position: int) -> int:
+        """Position of the previously selected item in a refreshed list."""
+        if 0 <= position < len(previous):
+            selected = previous[position]
+            for i, item in enumerate(current):
+                # Regular and virtual collections can share ids
+                if item.id == selected.id and getattr(item, "virtual", None) == getattr(
+                    selected, "virtual", None
+                ):
+                    return i
+        return max(0, min(position, len(current) - 1))
+
+    def _restore_snapshot(self) -> None:
+        """Show the lists and cursor of the last session until they are fetched."""
+        state = self.snapshot.load(self.api.host, self.api.username)
+        if state is None:
+            return
+
+        self.status.platforms = self._cursor_platforms = state["platforms"]
+        self.status.collections = self._cursor_collections = state["collections"]
+        # Positions of a hand edited snapshot may be past the end of the lists
+        self.platforms_selected_position = max(
+            0, min(state["platforms_selected_position"], len(state["platforms"]) - 1)
+        )
+        self.collections_selected_position = max(
+            0,
+            min(state["collections_selected_position"], len(state["collections"]) - 1),
+        )
+        if state["current_view"] in (View.PLATFORMS, View.COLLECTIONS):
+            self.status.current_view = state["current_view"]
+        if state["me"] is not None:
+            self.status.me = state["me"]
+            if os.path.exists(state["profile_pic_path"]):
+                self.status.profile_pic_path = state["profile_pic_path"]
+            self.status.me_ready.set()
+        print(
+            f"Restored {len(self.status.platforms)} platforms and "
+            f"{len(self.status.collections)} collections from the last session"
+        )
+
+    def save_snapshot(self) -> None:
+        if not self.status.platforms:
+            return
+        if self.status.current_view == View.COLLECTIONS or (
+            self.status.current_view == View.ROMS
+            and not self.status.selected_platform
+            and not self.status.global_search
+        ):
+            current_view = View.COLLECTIONS
+        else:
+            current_view = View.PLATFORMS
+        self.snapshot.save(
+            self.api.host,
+            self.api.username,
+            {
+                "platforms": self.status.platforms,
+                "collections": self.status.collections,
+                "platforms_selected_position": self.platforms_selected_position,
+                "collections_selected_position": self.collections_selected_position,
+                "current_view": current_view,
+                "me": self.status.me,
+                "profile_pic_path": self.status.profile_pic_path,
+            },
+        )
 
     def start(self):
+        self._restore_snapshot()
         self._render_platforms_view()
-        threading.Thread(target=self._monitor_input, daemon=True).start()
-        threading.Thread(target=self._check_for_updates).start()
+        # Daemon, exiting doesn't wait for a slow or offline GitHub
+        threading.Thread(target=self._check_for_updates, daemon=True).start()
         threading.Thread(target=self.api.fetch_platforms).start()
         threading.Thread(target=self.api.fetch_collections).start()
         threading.Thread(target=self.api.fetch_me).start()
@@ -793,6 +1237,10 @@ class RomM:
             self._handle_update_confirmation()
             return
 
+        if self.updater.downloading or self.updater.download_result is not None:
+            self._render_update_download()
+            return
+
         if self.status.updating.is_set():
             return
 
@@ -854,7 +1302,10 @@ class RomM:
                     not self.status.show_start_menu
                     and not self.status.show_contextual_menu
                 ):
-                    self._update_roms_view()
+                    if self.status.show_search_keyboard:
+                        self._update_search_keyboard()
+                    else:
+                        self._update_roms_view()
             else:
                 self._render_platforms_view()
                 if (
@@ -895,3 +1346,5 @@ class RomM:
                 [storage_path, full_path]
             ) == storage_path and os.path.isfile(full_path):
                 os.remove(full_path)
+
+        self.fs.forget_rom_presence()
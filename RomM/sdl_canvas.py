@@ -0,0 +1,357 @@
+import ctypes
+import math
+from typing import Optional
+
+import sdl2
+from PIL import Image, ImageColor, ImageDraw, ImageFont
+
+# Characters baked into every atlas up front, others are added when first drawn:
+# ASCII, Latin-1 and the icons of romm.ttf (see glyps.py)
+ATLAS_CHARSET = "".join(
+    chr(c) for c in (*range(32, 127), *range(160, 256), *range(0xF000, 0xF010))
+)
+
+
+class Glyph:
+    __slots__ = ("rect", "offset_x", "offset_y", "advance")
+
+    def __init__(
+        self,
+        rect: Optional[sdl2.SDL_Rect],
+        offset_x: int,
+        offset_y: int,
+        advance: float,
+    ) -> None:
+        self.rect = rect
+        self.offset_x = offset_x
+        self.offset_y = offset_y
+        self.advance = advance
+
+
+class GlyphAtlas:
+    """Glyphs of one font size, rasterized once into a single texture.
+
+    The texture is white with the glyph coverage as alpha, so any text color
+    is drawn with a color modulation of the same texture.
+    """
+
+    width = 1024
+    height = 512
+    padding = 1
+
+    def __init__(
+        self, renderer: sdl2.SDL_Renderer, font: ImageFont.FreeTypeFont
+    ) -> None:
+        self.renderer = renderer
+        self.font = font
+        self.line_spacing = font.getbbox("A")[3]
+        # Position of the ascender line relative to each vertical anchor
+        top = font.getbbox("A", anchor="la")[1]
+        self.vertical_offsets = {
+            anchor: font.getbbox("A", anchor="l" + anchor)[1] - top
+            for anchor in "atmsbd"
+        }
+
+        self.texture = sdl2.SDL_CreateTexture(
+            renderer,
+            sdl2.SDL_PIXELFORMAT_RGBA32,
+            sdl2.SDL_TEXTUREACCESS_STATIC,
+            self.width,
+            self.height,
+        )
+        if not self.texture:
+            print(f"Failed to create glyph atlas: {sdl2.SDL_GetError()}")
+            raise RuntimeError("Failed to create glyph atlas")
+        sdl2.SDL_SetTextureBlendMode(self.texture, sdl2.SDL_BLENDMODE_BLEND)
+
+        self._glyphs: dict[str, Glyph] = {}
+        self._shelf_x = 0
+        self._shelf_y = 0
+        self._shelf_height = 0
+
+        atlas = Image.new("L", (self.width, self.height))
+        for char in ATLAS_CHARSET:
+            self._add(char, atlas)
+        self._upload(atlas, (0, 0, self.width, self.height))
+
+    def glyph(self, char: str) -> Glyph:
+        glyph = self._glyphs.get(char)
+        if glyph is None:
+            glyph = self._add(char)
+        return glyph
+
+    def text_width(self, line: str) -> float:
+        return sum(self.glyph(char).advance for char in line)
+
+    def _add(self, char: str, atlas: Optional[Image.Image] = None) -> Glyph:
+        left, top, right, bottom = self.font.getbbox(char, anchor="la")
+        advance = self.font.getlength(char)
+        width, height = right - left, bottom - top
+        if width <= 0 or height <= 0:
+            glyph = Glyph(None, 0, 0, advance)
+            self._glyphs[char] = glyph
+            return glyph
+
+        # Shelf packing, left to right in rows as tall as their tallest glyph
+        if self._shelf_x + width > self.width:
+            self._shelf_x = 0
+            self._shelf_y += self._shelf_height + self.padding
+            self._shelf_height = 0
+        if self._shelf_y + height > self.height:
+            print(f"Glyph atlas is full, can't draw {char!r}")
+            glyph = Glyph(None, 0, 0, advance)
+            self._glyphs[char] = glyph
+            return glyph
+
+        bitmap = Image.new("L", (width, height))
+        ImageDraw.Draw(bitmap).text((-left, -top), char, fill=255, font=self.font)
+        x, y = self._shelf_x, self._shelf_y
+        if atlas is not None:
+            atlas.paste(bitmap, (x, y))
+        else:
+            self._upload(bitmap, (x, y, width, height))
+
+        self._shelf_x += width + self.padding
+        self._shelf_height = max(self._shelf_height, height)
+        glyph = Glyph(sdl2.SDL_Rect(x, y, width, height), left, top, advance)
+        self._glyphs[char] = glyph
+        return glyph
+
+    def _upload(self, coverage: Image.Image, rect: tuple[int, int, int, int]) -> None:
+        white = Image.new("L", coverage.size, 255)
+        pixels = Image.merge("RGBA", (white, white, white, coverage)).tobytes()
+        sdl2.SDL_UpdateTexture(
+            self.texture, sdl2.SDL_Rect(*rect), pixels, coverage.width * 4
+        )
+
+    def destroy(self) -> None:
+        sdl2.SDL_DestroyTexture(self.texture)
+
+
+class SDLCanvas:
+    """Draws the UI primitives straight to an SDL render target.
+
+    Alternative to drawing the frame into a PIL image and uploading it: shapes
+    are filled by the renderer, images are uploaded once as textures and text
+    is copied glyph by glyph from a GlyphAtlas per font size.
+    """
+
+    # Max number of images kept as textures
+    max_textures = 64
+
+    def __init__(
+        self,
+        renderer: sdl2.SDL_Renderer,
+        fonts: dict[str, ImageFont.FreeTypeFont],
+    ) -> None:
+        self.renderer = renderer
+        self.fonts = fonts
+        # Built the first time each font size is drawn
+        self.atlases: dict[str, GlyphAtlas] = {}
+        self._colors: dict[str, tuple[int, ...]] = {}
+        self._textures: dict[int, tuple[Image.Image, sdl2.SDL_Texture]] = {}
+        self._corners: dict[int, list[int]] = {}
+
+    def cleanup(self) -> None:
+        for atlas in self.atlases.values():
+            atlas.destroy()
+        self._clear_textures()
+
+    ###
+    # STATE
+    ###
+
+    def _set_color(self, color: str) -> tuple[int, ...]:
+        rgba = self._colors.get(color)
+        if rgba is None:
+            rgba = ImageColor.getrgb(color)
+            if len(rgba) == 3:
+                rgba = (*rgba, 255)
+            self._colors[color] = rgba
+        sdl2.SDL_SetRenderDrawColor(self.renderer, *rgba)
+        return rgba
+
+    def _fill_rects(self, rects: list[tuple[int, int, int, int]]) -> None:
+        rects = [rect for rect in rects if rect[2] > 0 and rect[3] > 0]
+        if rects:
+            array = (sdl2.SDL_Rect * len(rects))(*(sdl2.SDL_Rect(*r) for r in rects))
+            sdl2.SDL_RenderFillRects(self.renderer, array, len(rects))
+
+    ###
+    # PRIMITIVES
+    ###
+
+    def clear(self, color: str = "black") -> None:
+        self._set_color(color)
+        sdl2.SDL_RenderClear(self.renderer)
+
+    def rectangle(
+        self,
+        xy,
+        fill: Optional[str] = None,
+        outline: Optional[str] = None,
+        width: int = 1,
+    ) -> None:
+        x0, y0, x1, y1 = (int(v) for v in _flatten(xy))
+        # Coordinates are inclusive, like PIL
+        w, h = x1 - x0 + 1, y1 - y0 + 1
+        if fill:
+            self._set_color(fill)
+            self._fill_rects([(x0, y0, w, h)])
+        if outline and width > 0:
+            self._set_color(outline)
+            self._fill_rects(
+                [
+                    (x0, y0, w, width),
+                    (x0, y1 - width + 1, w, width),
+                    (x0, y0 + width, width, h - 2 * width),
+                    (x1 - width + 1, y0 + width, width, h - 2 * width),
+                ]
+            )
+
+    def _corner_insets(self, radius: int) -> list[int]:
+        """Horizontal inset of each row of a rounded corner, from the top."""
+        insets = self._corners.get(radius)
+        if insets is None:
+            insets = [
+                radius
+                - int(math.sqrt(max(0.0, radius**2 - (radius - dy - 0.5) ** 2)) + 0.5)
+                for dy in range(radius)
+            ]
+            self._corners[radius] = insets
+        return insets
+
+    def rounded_rectangle(
+        self,
+        xy,
+        radius: float,
+        fill: Optional[str] = None,
+        outline: Optional[str] = None,
+    ) -> None:
+        x0, y0, x1, y1 = (int(v) for v in _flatten(xy))
+        w, h = x1 - x0 + 1, y1 - y0 + 1
+        r = int(min(radius, w / 2, h / 2))
+        if r <= 0:
+            self.rectangle((x0, y0, x1, y1), fill=fill, outline=outline)
+            return
+
+        insets = self._corner_insets(r)
+        if fill:
+            self._set_color(fill)
+            rects = [(x0, y0 + r, w, h - 2 * r)]
+            for dy, inset in enumerate(insets):
+                rects.append((x0 + inset, y0 + dy, w - 2 * inset, 1))
+                rects.append((x0 + inset, y1 - dy, w - 2 * inset, 1))
+            self._fill_rects(rects)
+        if outline:
+            self._set_color(outline)
+            rects = [
+                (x0 + r, y0, w - 2 * r, 1),
+                (x0 + r, y1, w - 2 * r, 1),
+                (x0, y0 + r, 1, h - 2 * r),
+                (x1, y0 + r, 1, h - 2 * r),
+            ]
+            # Each corner row joins its inset to the inset of the row above
+            for dy, inset in enumerate(insets):
+                span = max(1, (insets[dy - 1] if dy else r) - inset)
+                for y in (y0 + dy, y1 - dy):
+                    rects.append((x0 + inset, y, span, 1))
+                    rects.append((x1 - inset - span + 1, y, span, 1))
+            self._fill_rects(rects)
+
+    def ellipse(
+        self,
+        xy,
+        fill: Optional[str] = None,
+        outline: Optional[str] = None,
+    ) -> None:
+        x0, y0, x1, y1 = (int(v) for v in _flatten(xy))
+        self.rounded_rectangle(
+            (x0, y0, x1, y1), min(x1 - x0 + 1, y1 - y0 + 1) / 2, fill, outline
+        )
+
+    def paste(self, image: Image.Image, position: tuple[int, int]) -> None:
+        """Draw an RGBA image blended with its own alpha."""
+        entry = self._textures.get(id(image))
+        if entry is None or entry[0] is not image:
+            if len(self._textures) >= self.max_textures:
+                self._clear_textures()
+            texture = sdl2.SDL_CreateTexture(
+                self.renderer,
+                sdl2.SDL_PIXELFORMAT_RGBA32,
+                sdl2.SDL_TEXTUREACCESS_STATIC,
+                image.width,
+                image.height,
+            )
+            if not texture:
+                print(f"Failed to create image texture: {sdl2.SDL_GetError()}")
+                return
+            sdl2.SDL_UpdateTexture(texture, None, image.tobytes(), image.width * 4)
+            sdl2.SDL_SetTextureBlendMode(texture, sdl2.SDL_BLENDMODE_BLEND)
+            entry = (image, texture)
+            self._textures[id(image)] = entry
+
+        dst = sdl2.SDL_Rect(
+            int(position[0]), int(position[1]), image.width, image.height
+        )
+        sdl2.SDL_RenderCopy(self.renderer, entry[1], None, dst)
+
+    def _clear_textures(self) -> None:
+        for _image, texture in self._textures.values():
+            sdl2.SDL_DestroyTexture(texture)
+        self._textures.clear()
+
+    def text(
+        self,
+        position: tuple[float, float],
+        text: str,
+        size: str,
+        color: str,
+        anchor: Optional[str] = None,
+        spacing: float = 4,
+    ) -> None:
+        atlas = self.atlases.get(size)
+        if atlas is None:
+            atlas = self.atlases[size] = GlyphAtlas(self.renderer, self.fonts[size])
+        anchor = anchor or "la"
+        lines = text.split("\n")
+        line_height = atlas.line_spacing + spacing
+
+        x, y = position
+        y += atlas.vertical_offsets[anchor[1]]
+        if anchor[1] == "m":
+            y -= (len(lines) - 1) * line_height / 2
+        elif anchor[1] in "sbd":
+            y -= (len(lines) - 1) * line_height
+
+        r, g, b, a = self._colors.get(color) or self._set_color(color)
+        sdl2.SDL_SetTextureColorMod(atlas.texture, r, g, b)
+        sdl2.SDL_SetTextureAlphaMod(atlas.texture, a)
+
+        for line in lines:
+            pen_x = x
+            if anchor[0] == "m":
+                pen_x -= atlas.text_width(line) / 2
+            elif anchor[0] == "r":
+                pen_x -= atlas.text_width(line)
+            for char in line:
+                glyph = atlas.glyph(char)
+                if glyph.rect is not None:
+                    dst = sdl2.SDL_Rect(
+                        int(pen_x) + glyph.offset_x,
+                        int(y) + glyph.offset_y,
+                        glyph.rect.w,
+                        glyph.rect.h,
+                    )
+                    sdl2.SDL_RenderCopy(
+                        self.renderer, atlas.texture, ctypes.byref(glyph.rect), dst
+                    )
+                pen_x += glyph.advance
+            y += line_height
+
+
+def _flatten(xy) -> tuple[float, ...]:
+    """Accept both [x0, y0, x1, y1] and [(x0, y0), (x1, y1)] like PIL."""
+    if isinstance(xy[0], (tuple, list)):
+        return (*xy[0], *xy[1])
+    return tuple(xy)
@@ -0,0 +1,179 @@
+import re
+import sys
+import threading
+import time
+import unicodedata
+from array import array
+from typing import Optional
+
+from api import API
+from cache import LRUCache
+from rom_table import RomTable
+
+_SEPARATORS = re.compile(r"[\W_]+")
+
+
+def normalize(text: str | None) -> str:
+    """Lower case text without accents, punctuation collapsed into single spaces."""
+    if not text:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", text)
+    text = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return _SEPARATORS.sub(" ", text.lower()).lstrip()
+
+
+class SearchIndex:
+    """Trigram index over the normalized name and fs_name_no_tags of a RomTable.
+
+    Queries of 3 characters or more only check the ROMs containing their
+    rarest trigram, shorter ones scan the normalized names. Results are row
+    positions in the table, in table order.
+    """
+
+    def __init__(self, roms: RomTable) -> None:
+        start = time.perf_counter()
+
+        self._texts: list[str] = []
+        postings: dict[str, list[int]] = {}
+        names = zip(roms.column("name"), roms.column("fs_name_no_tags"), strict=True)
+        for row, (name, fs_name) in enumerate(names):
+            text = normalize(name)
+            fs_text = normalize(fs_name)
+            if fs_text and fs_text != text:
+                # No query can contain the separator, so none matches across it
+                text = f"{text}|{fs_text}"
+            self._texts.append(text)
+            for trigram in {text[i : i + 3] for i in range(len(text) - 2)}:
+                postings.setdefault(trigram, []).append(row)
+        self._postings = {
+            trigram: array("L", rows) for trigram, rows in postings.items()
+        }
+
+        self.build_ms = (time.perf_counter() - start) * 1000
+        self.memory_bytes = (
+            sys.getsizeof(self._texts)
+            + sum(sys.getsizeof(text) for text in self._texts)
+            + sys.getsizeof(self._postings)
+            + sum(
+                sys.getsizeof(trigram) + sys.getsizeof(rows)
+                for trigram, rows in self._postings.items()
+            )
+        )
+
+    def __len__(self) -> int:
+        return len(self._texts)
+
+    def stats(self) -> str:
+        return (
+            f"{len(self._texts)} ROMs, {len(self._postings)} trigrams, "
+            f"built in {self.build_ms:.1f}ms, {self.memory_bytes / 1024:.0f}KB"
+        )
+
+    def search(self, query: str) -> list[int]:
+        """Return the rows whose names contain the normalized query."""
+        query = normalize(query)
+        if not query:
+            return list(range(len(self._texts)))
+
+        if len(query) < 3:
+            candidates: "range | array[int]" = range(len(self._texts))
+        else:
+            trigrams = {query[i : i + 3] for i in range(len(query) - 2)}
+            candidates = min(
+                (self._postings.get(trigram, array("L")) for trigram in trigrams),
+                key=len,
+            )
+
+        texts = self._texts
+        return [row for row in candidates if query in texts[row]]
+
+
+class GlobalSearch:
+    """Searches the whole RomM library while the query is typed.
+
+    Results go to status.roms, like a platform's ROMs. Queries are sent by a
+    single worker thread once no key was typed for `debounce` seconds. A
+    query whose text changed before its response arrived is dropped while
+    reading it, and results of recent queries are served from an LRU.
+    """
+
+    # Seconds without typing before the query is sent
+    debounce = 0.35
+
+    # Number of recent queries whose results are kept
+    cache_size = 32
+
+    def __init__(self, api: API) -> None:
+        self.api = api
+        self.status = api.status
+        self._results: LRUCache[str, RomTable] = LRUCache(self.cache_size)
+        self._condition = threading.Condition()
+        self._query = ""
+        self._generation = 0
+        self._pending = False
+        self._changed_at = 0.0
+        self._worker: Optional[threading.Thread] = None
+
+    def set_query(self, query: str) -> None:
+        query = query.strip().lower()
+        with self._condition:
+            self._query = query
+            # Results of any older query still in flight are dropped
+            self._generation += 1
+            self._changed_at = time.monotonic()
+
+            cached = self._results.get(query) if query else RomTable()
+            if cached is not None:
+                self._pending = False
+                self.status.roms = cached
+                self.status.roms_ready.set()
+                return
+
+            self._pending = True
+            self.status.roms_ready.clear()
+            self._condition.notify()
+
+        if self._worker is None:
+            self._worker = threading.Thread(target=self._run, daemon=True)
+            self._worker.start()
+
+    def refresh(self) -> None:
+        """Forget cached results and search the current query again."""
+        self._results.clear()
+        self.set_query(self._query)
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while not self._pending:
+                    self._condition.wait()
+                # Wait until the query stopped changing for `debounce` seconds
+                while (
+                    remaining := self._changed_at + self.debounce - time.monotonic()
+                ) > 0:
+                    self._condition.wait(remaining)
+                if not self._pending:
+                    continue
+                self._pending = False
+                query, generation = self._query, self._generation
+
+            start = time.perf_counter()
+            items = self.api.search_roms(
+                query,
+                is_current=lambda generation=generation: generation == self._generation,
+            )
+
+            with self._condition:
+                if generation != self._generation:
+                    print(f"Search for {query!r} cancelled, the query changed")
+                    continue
+                if items is None:
+                    self.status.roms = RomTable()
+                else:
+                    self.status.roms = RomTable.from_payload(items)
+                    self._results.put(query, self.status.roms)
+                    print(
+                        f"Search for {query!r}: {len(items)} ROMs in "
+                        f"{(time.perf_counter() - start) * 1000:.0f}ms"
+                    )
+                self.status.roms_ready.set()
@@ -0,0 +1,65 @@
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+
+class StartupTrace:
+    """Time spent in each import and init step before the first frame.
+
+    Steps are kept in memory, since the log file is only opened once the
+    .env file is loaded, and printed by report() when the first frame is
+    on screen. Nested steps are indented under the step they run in.
+    """
+
+    _instance: Optional["StartupTrace"] = None
+    _initialized: bool = False
+
+    def __new__(cls):
+        if not cls._instance:
+            cls._instance = super(StartupTrace, cls).__new__(cls)
+        return cls._instance
+
+    def __init__(self) -> None:
+        if self._initialized:
+            return
+
+        self.start = time.perf_counter()
+        self.steps: list[tuple[int, str, float]] = []
+        self.done = False
+        self.interactive = False
+        self._depth = 0
+        self._initialized = True
+
+    @contextmanager
+    def step(self, name: str) -> Iterator[None]:
+        if self.done:
+            yield
+            return
+
+        index = len(self.steps)
+        self.steps.append((self._depth, name, 0.0))
+        self._depth += 1
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._depth -= 1
+            self.steps[index] = (self._depth, name, time.perf_counter() - start)
+
+    def report(self) -> None:
+        """Print the steps once, with the time from start to the first frame."""
+        if self.done:
+            return
+        self.done = True
+        total = time.perf_counter() - self.start
+        print(f"Startup: first frame after {total * 1000:.0f}ms")
+        for depth, name, seconds in self.steps:
+            print(f"  {'  ' * depth}{name}: {seconds * 1000:.1f}ms")
+
+    def report_interactive(self, source: str) -> None:
+        """Print once the time to the first frame with a usable list."""
+        if self.interactive:
+            return
+        self.interactive = True
+        total = time.perf_counter() - self.start
+        print(f"Startup: interactive after {total * 1000:.0f}ms, {source}")
@@ -0,0 +1,79 @@
+import json
+import os
+from typing import Any, Optional
+
+from models import Collection, Platform
+
+
+class StateSnapshot:
+    """The lists and cursor the app was showing when it last exited.
+
+    Loaded at startup so the first frame shows the platforms, collections
+    and profile of the last session while they are fetched again. Saved
+    to STATE_SNAPSHOT_PATH on exit, for the host and user it was taken
+    with only.
+    """
+
+    # Bumped when the saved fields change, older snapshots are ignored
+    version = 1
+    # Saved fields, and the types a snapshot is only used with
+    fields = {
+        "platforms": list,
+        "collections": list,
+        "platforms_selected_position": int,
+        "collections_selected_position": int,
+        "current_view": str,
+        "me": (dict, type(None)),
+        "profile_pic_path": str,
+    }
+
+    def __init__(self) -> None:
+        self.path = os.getenv(
+            "STATE_SNAPSHOT_PATH", os.path.join(os.getcwd(), "cache", "state.json")
+        )
+
+    def load(self, host: str, username: str) -> Optional[dict[str, Any]]:
+        try:
+            with open(self.path) as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if not isinstance(state, dict) or (
+            state.get("version") != self.version
+            or state.get("host") != host
+            or state.get("username") != username
+        ):
+            return None
+
+        invalid = [
+            field
+            for field, types in self.fields.items()
+            if field not in state or not isinstance(state[field], types)
+        ]
+        if invalid:
+            print(f"Ignoring invalid state snapshot, bad fields: {invalid}")
+            return None
+
+        try:
+            state["platforms"] = [Platform(*p) for p in state["platforms"]]
+            state["collections"] = [Collection(*c) for c in state["collections"]]
+        except TypeError as e:
+            print(f"Ignoring invalid state snapshot: {e}")
+            return None
+        return state
+
+    def save(self, host: str, username: str, state: dict[str, Any]) -> None:
+        state = {
+            **state,
+            "version": self.version,
+            "host": host,
+            "username": username,
+        }
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(f"{self.path}.tmp", "w") as f:
+                json.dump(state, f)
+            os.replace(f"{self.path}.tmp", self.path)
+        except OSError as e:
+            print(f"Error saving state snapshot: {e}")
@@ -3,6 +3,7 @@ import threading
 from typing import Optional
 
 from models import Collection, Platform, Rom
+from rom_table import RomTable
 
 
 class View:
@@ -43,10 +44,14 @@ class Status:
 
         self.platforms: list[Platform] = []
         self.collections: list[Collection] = []
-        self.roms: list[Rom] = []
-        self.roms_to_show: list[Rom] = []
+        self.roms: RomTable = RomTable()
+        self.roms_to_show: RomTable = self.roms
         self.filters = itertools.cycle([Filter.ALL, Filter.LOCAL, Filter.REMOTE])
         self.current_filter = next(self.filters)
+        self.search_query = ""
+        self.show_search_keyboard = False
+        # status.roms holds the results of a search over the whole library
+        self.global_search = False
 
         self.platforms_ready = threading.Event()
         self.collections_ready = threading.Event()
@@ -55,11 +60,13 @@ class Status:
         self.abort_download = threading.Event()
         self.me_ready = threading.Event()
         self.updating = threading.Event()
+        self.catalogue_ready = threading.Event()
 
         # Initialize events what won't launch at startup
         self.roms_ready.set()
         self.download_rom_ready.set()
         self.abort_download.set()
+        self.catalogue_ready.set()
 
         self.multi_selected_roms: list[Rom] = []
         self.download_queue: list[Rom] = []
@@ -69,6 +76,13 @@ class Status:
         self.downloaded_percent = 0.0
         self.extracting_rom = False
         self.extracted_percent = 0.0
+        # Progress of CatalogueBuilder.rebuild
+        self.catalogue_step = ""
+        self.catalogue_done = 0
+        self.catalogue_total = 0
 
     def reset_roms_list(self) -> None:
-        self.roms = []
+        self.roms = RomTable()
+        self.search_query = ""
+        self.show_search_keyboard = False
+        self.global_search = False
@@ -1,10 +1,12 @@
 import ctypes
+import math
 import os
 import shutil
 import time
-from typing import Optional
+from typing import Callable, Hashable, Optional
 
 import sdl2
+from cache import ImageCache, LRUCache
 from config import (
     color_btn_a,
     color_btn_b,
@@ -13,13 +15,24 @@ from filesystem import Filesystem
 from glyps import glyphs
 from models import Collection, Platform, Rom
 from PIL import Image, ImageDraw, ImageFont, _typing
+from sdl_canvas import SDLCanvas
 from status import Status
 
-FONT_FILE = {
-    "sm": ImageFont.truetype(os.path.join(os.getcwd(), "fonts/romm.ttf"), 12),
-    "md": ImageFont.truetype(os.path.join(os.getcwd(), "fonts/romm.ttf"), 15),
-    "lg": ImageFont.truetype(os.path.join(os.getcwd(), "fonts/romm.ttf"), 18),
-}
+FONT_SIZES = {"sm": 12, "md": 15, "lg": 18}
+
+
+class _Fonts(dict):
+    """Font of each size, loaded the first time the size is drawn."""
+
+    def __missing__(self, size: str) -> ImageFont.FreeTypeFont:
+        font = ImageFont.truetype(
+            os.path.join(os.getcwd(), "fonts/romm.ttf"), FONT_SIZES[size]
+        )
+        self[size] = font
+        return font
+
+
+FONT_FILE: dict[str, ImageFont.FreeTypeFont] = _Fonts()
 
 color_row_bg = "#383838"
 color_menu_bg = "#141414"
@@ -33,6 +46,7 @@ class UserInterface:
 
     fs = Filesystem()
     status = Status()
+    images = ImageCache()
 
     screen_width = 640
     screen_height = 480
@@ -42,13 +56,44 @@ class UserInterface:
     active_image: Image.Image
     active_draw: ImageDraw.ImageDraw
 
+    # Set while drawing a frame that changes over time (marquees, spinners...)
+    frame_is_animated = False
+
+    # Max number of cached ROM row texts, see _rom_row_text
+    rom_rows_cache_size = 2048
+
+    # Memory budget of the pre-rendered layers, see draw_layer
+    layers_cache_bytes = 6 * 1024 * 1024
+
+    # Memory budget of the rasterized texts, see _text_bitmap
+    text_cache_bytes = 2 * 1024 * 1024
+
+    # Screen position of the image being drawn on, (0, 0) unless inside a layer
+    _origin: tuple[int, int] = (0, 0)
+
+    # Set when drawing with the "sdl" RENDER_BACKEND instead of into active_image
+    canvas: Optional[SDLCanvas] = None
+
     def __init__(self):
         if self._initialized:
             return
         self.window = self._create_window()
         self.renderer = self._create_renderer()
+        self.canvas = self._create_canvas()
+        self.texture = self._create_texture()
+        self.active_image = self._create_frame_image()
+        self.active_draw = ImageDraw.Draw(self.active_image)
         self.draw_start()
         self.opt_stretch = True
+        self._rom_rows_cache: dict[tuple, str | tuple[str, str, str]] = {}
+        self._layers: LRUCache[Hashable, Image.Image] = LRUCache(
+            self.layers_cache_bytes, cost=lambda layer: layer.width * layer.height * 4
+        )
+        self._text_bitmaps: LRUCache[Hashable, tuple] = LRUCache(
+            self.text_cache_bytes,
+            cost=lambda bitmap: bitmap[0].width * bitmap[0].height,
+        )
+        self._text_measure = ImageDraw.Draw(Image.new("L", (1, 1)))
         self._initialized = True
 
     def __new__(cls):
@@ -64,13 +109,39 @@ class UserInterface:
         """Create a new blank RGBA image for drawing."""
         return Image.new("RGBA", (self.screen_width, self.screen_height), color="black")
 
+    def _create_frame_image(self) -> Image.Image:
+        """Create the frame image, drawn in place into the texture upload buffer."""
+        self._frame_buffer = (
+            ctypes.c_uint8 * (self.screen_width * self.screen_height * 4)
+        )()
+        image = Image.frombuffer(
+            "RGBA",
+            (self.screen_width, self.screen_height),
+            self._frame_buffer,
+            "raw",
+            "RGBA",
+            0,
+            1,
+        )
+        # Mapped images are read-only by default, drawing would copy the pixels
+        # out of the buffer instead of writing into it
+        image.readonly = 0
+        return image
+
     def draw_start(self):
         """Initialize drawing for a new frame."""
+        if self.canvas:
+            self.canvas.clear()
+            self.frame_is_animated = False
+            return
         # Render directly to the screen
         sdl2.SDL_SetRenderDrawColor(self.renderer, 0, 0, 0, 255)
         sdl2.SDL_RenderClear(self.renderer)
-        self.active_image = self.create_image()
-        self.active_draw = ImageDraw.Draw(self.active_image)
+        # Reuse the frame buffer, cleared to black
+        self.active_image.paste(
+            (0, 0, 0, 255), (0, 0, self.screen_width, self.screen_height)
+        )
+        self.frame_is_animated = False
 
     def _create_window(self):
         window = sdl2.SDL_CreateWindow(
@@ -89,9 +160,10 @@ class UserInterface:
         return window
 
     def _create_renderer(self):
-        renderer = sdl2.SDL_CreateRenderer(
-            self.window, -1, sdl2.SDL_RENDERER_ACCELERATED
-        )
+        flags = sdl2.SDL_RENDERER_ACCELERATED
+        if os.getenv("VSYNC", "false").lower() in ("true", "1"):
+            flags |= sdl2.SDL_RENDERER_PRESENTVSYNC
+        renderer = sdl2.SDL_CreateRenderer(self.window, -1, flags)
 
         if not renderer:
             print(f"Failed to create renderer: {sdl2.SDL_GetError()}")
@@ -100,19 +172,50 @@ class UserInterface:
         sdl2.SDL_SetHint(sdl2.SDL_HINT_RENDER_SCALE_QUALITY, b"0")
         return renderer
 
-    def render_to_screen(self):
-        # Convert PIL image to SDL2 texture at base resolution
-        rgba_data = self.active_image.tobytes()
-        surface = sdl2.SDL_CreateRGBSurfaceWithFormatFrom(
-            rgba_data,
+    def _create_canvas(self) -> Optional[SDLCanvas]:
+        """Create the SDL canvas if RENDER_BACKEND selects it and it's supported."""
+        backend = os.getenv("RENDER_BACKEND", "pil").lower()
+        if backend != "sdl":
+            return None
+        if not sdl2.SDL_RenderTargetSupported(self.renderer):
+            print("Render targets not supported, using the pil render backend")
+            return None
+        return SDLCanvas(self.renderer, self.font_file)
+
+    def _create_texture(self):
+        texture = sdl2.SDL_CreateTexture(
+            self.renderer,
+            sdl2.SDL_PIXELFORMAT_RGBA32,
+            (
+                # The SDL canvas draws into the texture, the PIL image is uploaded to it
+                sdl2.SDL_TEXTUREACCESS_TARGET
+                if self.canvas
+                else sdl2.SDL_TEXTUREACCESS_STREAMING
+            ),
             self.screen_width,
             self.screen_height,
-            32,
-            self.screen_width * 4,
-            sdl2.SDL_PIXELFORMAT_RGBA32,
         )
-        texture = sdl2.SDL_CreateTextureFromSurface(self.renderer, surface)
-        sdl2.SDL_FreeSurface(surface)
+
+        if not texture:
+            print(f"Failed to create texture: {sdl2.SDL_GetError()}")
+            raise RuntimeError("Failed to create texture")
+
+        sdl2.SDL_SetTextureBlendMode(texture, sdl2.SDL_BLENDMODE_BLEND)
+        if self.canvas:
+            sdl2.SDL_SetRenderTarget(self.renderer, texture)
+        return texture
+
+    def render_to_screen(self):
+        if self.canvas:
+            # Draw the frame texture to the screen, then keep drawing into it
+            sdl2.SDL_SetRenderTarget(self.renderer, None)
+            sdl2.SDL_SetRenderDrawColor(self.renderer, 0, 0, 0, 255)
+            sdl2.SDL_RenderClear(self.renderer)
+        else:
+            # Upload the frame buffer to the streaming texture at base resolution
+            sdl2.SDL_UpdateTexture(
+                self.texture, None, self._frame_buffer, self.screen_width * 4
+            )
 
         # Get current window size
         window_width = ctypes.c_int()
@@ -135,11 +238,18 @@ class UserInterface:
         else:
             dst_rect = sdl2.SDL_Rect(0, 0, window_width, window_height)
 
-        sdl2.SDL_RenderCopy(self.renderer, texture, None, dst_rect)
+        sdl2.SDL_RenderCopy(self.renderer, self.texture, None, dst_rect)
         sdl2.SDL_RenderPresent(self.renderer)
-        sdl2.SDL_DestroyTexture(texture)
+        if self.canvas:
+            sdl2.SDL_SetRenderTarget(self.renderer, self.texture)
 
     def cleanup(self):
+        print(f"Image cache: {self.images.stats()}")
+        print(f"Layers cache: {self._layers.stats()}")
+        print(f"Text cache: {self._text_bitmaps.stats()}")
+        if self.canvas:
+            self.canvas.cleanup()
+        sdl2.SDL_DestroyTexture(self.texture)
         sdl2.SDL_DestroyRenderer(self.renderer)
         sdl2.SDL_DestroyWindow(self.window)
         sdl2.SDL_Quit()
@@ -149,10 +259,64 @@ class UserInterface:
     ###
 
     def draw_clear(self):
+        if self.canvas:
+            self.canvas.clear()
+            return
         self.active_draw.rectangle(
             [0, 0, self.screen_width, self.screen_height], fill="black"
         )
 
+    def _to_layer(self, coords):
+        """Translate screen coordinates to the layer being drawn, if any."""
+        if self._origin == (0, 0):
+            return coords
+        origin_x, origin_y = self._origin
+        if isinstance(coords[0], (tuple, list)):
+            return tuple((x - origin_x, y - origin_y) for x, y in coords)
+        return tuple(
+            value - (origin_y if i % 2 else origin_x) for i, value in enumerate(coords)
+        )
+
+    def draw_layer(
+        self,
+        key: Hashable,
+        box: tuple[int, int, int, int],
+        draw: Callable[[], None],
+        background: str = "black",
+    ):
+        """Paste a pre-rendered layer covering box, rendering it on a cache miss.
+
+        `draw` renders the layer with the usual drawing functions and screen
+        coordinates. Layers are opaque and filled with background, so they must
+        only cover parts of the frame that are known to be of that color.
+        """
+        if self.canvas:
+            # Drawing straight to the renderer is as cheap as copying a layer
+            draw()
+            return
+
+        layer = self._layers.get(key)
+        if layer is None:
+            layer = Image.new("RGBA", (box[2] - box[0], box[3] - box[1]), background)
+            frame = (self.active_image, self.active_draw, self._origin)
+            self.active_image = layer
+            self.active_draw = ImageDraw.Draw(layer)
+            self._origin = (box[0], box[1])
+            try:
+                draw()
+            finally:
+                self.active_image, self.active_draw, self._origin = frame
+            self._layers.put(key, layer)
+
+        self.active_image.paste(layer, self._to_layer(box[:2]))
+
+    def paste_image(self, image: Image.Image, position: tuple[int, int]):
+        """Draw an RGBA image blended with its own alpha."""
+        if self.canvas:
+            self.canvas.paste(image, position)
+            return
+        self.active_image.paste(image, self._to_layer(position), mask=image)
+
     def draw_text(
         self,
         position: tuple[float, float],
@@ -161,9 +325,117 @@ class UserInterface:
         color: str = color_text,
         **kwargs,
     ):
-        self.active_draw.text(
-            position, text, font=self.font_file[size], fill=color, **kwargs
+        if self.canvas:
+            self.canvas.text(position, text, size, color, **kwargs)
+            return
+        x, y = self._to_layer(position)
+        # Same split of whole and subpixel position as ImageDraw.text
+        origin_x, origin_y = int(x), int(y)
+        bitmap, left, top = self._text_bitmap(
+            text, size, x - origin_x, y - origin_y, kwargs
         )
+        self.active_image.paste(color, (origin_x + left, origin_y + top), bitmap)
+
+    def _text_bitmap(
+        self,
+        text: str,
+        size: str,
+        fraction_x: float,
+        fraction_y: float,
+        options: dict,
+    ) -> tuple[Image.Image, int, int]:
+        """Return the rasterized text as a coverage mask, with its offset.
+
+        Masks are cached per text, font size, subpixel position and drawing
+        options, and filled with the text color when pasted, so a label drawn
+        every frame is only rasterized once whatever its color.
+        """
+        key = (text, size, fraction_x, fraction_y, tuple(sorted(options.items())))
+        bitmap = self._text_bitmaps.get(key)
+        if bitmap is None:
+            bitmap = self._rasterize_text(text, size, fraction_x, fraction_y, options)
+            self._text_bitmaps.put(key, bitmap)
+        return bitmap
+
+    def _rasterize_text(
+        self,
+        text: str,
+        size: str,
+        fraction_x: float,
+        fraction_y: float,
+        options: dict,
+    ) -> tuple[Image.Image, int, int]:
+        font = self.font_file[size]
+        bbox = self._text_measure.textbbox(
+            (fraction_x, fraction_y), text, font=font, **options
+        )
+        # One pixel of margin for antialiasing outside the measured box
+        left, top = math.floor(bbox[0]) - 1, math.floor(bbox[1]) - 1
+        mask = Image.new(
+            "L", (math.ceil(bbox[2]) + 1 - left, math.ceil(bbox[3]) + 1 - top)
+        )
+        ImageDraw.Draw(mask).text(
+            (fraction_x - left, fraction_y - top),
+            text,
+            fill=255,
+            font=font,
+            **options,
+        )
+        return mask, left, top
+
+    def draw_marquee_text(
+        self,
+        position: tuple[float, float],
+        prefix: str,
+        scroll_text: str,
+        suffix: str,
+        max_len_text: int,
+        size: str = "md",
+        color: str = color_text,
+    ):
+        """Draw prefix, max_len_text characters of scroll_text rotating over time, then suffix.
+
+        The visible characters are cropped out of a cached bitmap of the
+        scrolling text written twice, so moving the marquee rasterizes nothing.
+        """
+        self.frame_is_animated = True
+        if self.canvas:
+            # Glyphs are copied from the atlas, the rotated text costs nothing more
+            shift_offset = (int(time.time() * 2)) % len(scroll_text)
+            scroll_text = scroll_text[shift_offset:] + scroll_text[:shift_offset]
+            text = f"{prefix}{scroll_text[:max_len_text]}{suffix}"
+            self.canvas.text(position, text, size, color)
+            return
+
+        x, y = position
+        if prefix:
+            self.draw_text((x, y), prefix, size=size, color=color)
+            x += self.font_file[size].getlength(prefix)
+
+        strip, left, top, offsets = self._marquee_strip(scroll_text, size)
+        shift_offset = (int(time.time() * 2)) % len(scroll_text)
+        start = offsets[shift_offset]
+        end = offsets[min(shift_offset + max_len_text, len(offsets) - 1)]
+        window = strip.crop((start - left, 0, end - left, strip.height))
+        layer_x, layer_y = self._to_layer((x, y))
+        self.active_image.paste(color, (round(layer_x), int(layer_y) + top), window)
+
+        self.draw_text((x + end - start, y), suffix, size=size, color=color)
+
+    def _marquee_strip(
+        self, scroll_text: str, size: str
+    ) -> tuple[Image.Image, int, int, list[int]]:
+        """Return the bitmap of scroll_text written twice, with character offsets."""
+        key = ("marquee", scroll_text, size)
+        strip = self._text_bitmaps.get(key)
+        if strip is None:
+            font = self.font_file[size]
+            text = scroll_text * 2
+            mask, left, top = self._rasterize_text(text, size, 0.0, 0.0, {})
+            offsets = [round(font.getlength(text[:i])) for i in range(len(text) + 1)]
+            strip = (mask, left, top, offsets)
+            self._text_bitmaps.put(key, strip)
+        return strip
 
     def draw_rectangle(
         self,
@@ -172,7 +444,12 @@ class UserInterface:
         outline: str | None = None,
         width: int = 1,
     ):
-        self.active_draw.rectangle(position, fill=fill, outline=outline, width=width)
+        if self.canvas:
+            self.canvas.rectangle(position, fill=fill, outline=outline, width=width)
+            return
+        self.active_draw.rectangle(
+            self._to_layer(position), fill=fill, outline=outline, width=width
+        )
 
     def draw_rectangle_r(
         self,
@@ -181,7 +458,12 @@ class UserInterface:
         fill: str | None = None,
         outline: str | None = None,
     ):
-        self.active_draw.rounded_rectangle(position, radius, fill=fill, outline=outline)
+        if self.canvas:
+            self.canvas.rounded_rectangle(position, radius, fill=fill, outline=outline)
+            return
+        self.active_draw.rounded_rectangle(
+            self._to_layer(position), radius, fill=fill, outline=outline
+        )
 
     def row_list(
         self,
@@ -195,43 +477,86 @@ class UserInterface:
         color: str = color_text,
         outline: str | None = None,
         append_icon_path: str | None = None,
+        background: str = color_menu_bg,
+        marquee: Optional[tuple[str, str, str, int]] = None,
     ):
+        """Draw a list row, from a cached layer of the same row when possible.
+
+        The row's layer is filled with background around its rounded corners,
+        which must match what is under the row (menus and lists use color_menu_bg).
+        Rows with a marquee, given as the draw_marquee_text arguments, draw it
+        over the cached row instead of text.
+        """
         if fill is None:
             fill = color_btn_a if self.layout_name == "nintendo" else color_btn_b
-        try:
-            icon = Image.open(append_icon_path) if append_icon_path else None
-        except (FileNotFoundError, AttributeError):
-            icon = None
-
-        radius = 5
+        icon = self.images.load(append_icon_path) if append_icon_path else None
         margin_left_text = 12 + (35 if icon else 0)
         margin_top_text = 8
 
         position_0: float = position[0]  # type: ignore
         position_1: float = position[1]  # type: ignore
 
-        self.draw_rectangle_r(
-            [position_0, position_1, position_0 + width, position_1 + height],
-            radius,
-            fill=fill if selected else color_row_bg,
-            outline=outline,
+        # Whole pixels the row covers, from the fractional position to width + 1
+        box = (
+            int(position_0),
+            int(position_1),
+            int(position_0) + width + 2,
+            int(position_1) + height + 2,
         )
+        key = (
+            "row",
+            text,
+            position_0 % 1,
+            position_1 % 1,
+            width,
+            height,
+            selected,
+            fill,
+            size,
+            color,
+            outline,
+            append_icon_path,
+            id(icon),
+            background,
+        )
+
+        def draw_row():
+            radius = 5
 
-        if icon:
-            margin_left_icon = 10
-            margin_top_icon = 5
-            self.active_image.paste(
-                icon,
-                (int(position_0 + margin_left_icon), int(position_1 + margin_top_icon)),
-                mask=icon if icon.mode == "RGBA" else None,
+            self.draw_rectangle_r(
+                [position_0, position_1, position_0 + width, position_1 + height],
+                radius,
+                fill=fill if selected else color_row_bg,
+                outline=outline,
             )
 
-        self.draw_text(
-            (position_0 + margin_left_text, position_1 + margin_top_text),
-            text,
-            color=color,
-            size=size,
-        )
+            if icon:
+                margin_left_icon = 10
+                margin_top_icon = 5
+                self.paste_image(
+                    icon,
+                    (
+                        int(position_0 + margin_left_icon),
+                        int(position_1 + margin_top_icon),
+                    ),
+                )
+
+            self.draw_text(
+                (position_0 + margin_left_text, position_1 + margin_top_text),
+                text,
+                color=color,
+                size=size,
+            )
+
+        self.draw_layer(key, box, draw_row, background=background)
+
+        if marquee:
+            self.draw_marquee_text(
+                (position_0 + margin_left_text, position_1 + margin_top_text),
+                *marquee,
+                size=size,
+                color=color,
+            )
 
     def draw_circle(
         self,
@@ -243,16 +568,16 @@ class UserInterface:
         position_0: float = position[0]  # type: ignore
         position_1: float = position[1]  # type: ignore
 
-        self.active_draw.ellipse(
-            [
-                position_0 - radius,
-                position_1 - radius,
-                position_0 + radius,
-                position_1 + radius,
-            ],
-            fill=fill,
-            outline=outline,
-        )
+        box = [
+            position_0 - radius,
+            position_1 - radius,
+            position_0 + radius,
+            position_1 + radius,
+        ]
+        if self.canvas:
+            self.canvas.ellipse(box, fill=fill, outline=outline)
+            return
+        self.active_draw.ellipse(self._to_layer(box), fill=fill, outline=outline)
 
     def button_circle(
         self,
@@ -365,12 +690,11 @@ class UserInterface:
 
     def draw_header(self, host: str, username: str):
         username = username if len(username) <= 22 else username[:19] + "..."
-        logo = Image.open(os.path.join(os.getcwd(), "resources/romm.png"))
+        logo = self.images.load(os.path.join(os.getcwd(), "resources/romm.png"))
         pos_logo = [15, 15]
         pos_text = [55, 9]
-        self.active_image.paste(
-            logo, (pos_logo[0], pos_logo[1]), mask=logo if logo.mode == "RGBA" else None
-        )
+        if logo:
+            self.paste_image(logo, (pos_logo[0], pos_logo[1]))
 
         roms_path = self.fs.get_roms_storage_path()
         total, used, _free = shutil.disk_usage(roms_path)
@@ -388,8 +712,12 @@ class UserInterface:
             f"{glyphs.microsd} {roms_path} ({used_gb:.1f}/{total_gb:.1f} GB, {used_percentage:.1f}% used)",
         )
 
-        if self.status.profile_pic_path:
-            profile_pic = Image.open(self.status.profile_pic_path)
+        profile_pic = (
+            self.images.load(self.status.profile_pic_path)
+            if self.status.profile_pic_path
+            else None
+        )
+        if profile_pic:
             margin_right_profile_pic = 45
             margin_top_profile_pic = 5
             pos_profile_pic = [
@@ -397,12 +725,113 @@ class UserInterface:
                 margin_top_profile_pic,
             ]
 
-            self.active_image.paste(
-                profile_pic,
-                (pos_profile_pic[0], pos_profile_pic[1]),
-                mask=profile_pic if profile_pic.mode == "RGBA" else None,
+            self.paste_image(profile_pic, (pos_profile_pic[0], pos_profile_pic[1]))
+
+    def draw_jump_letter(self, letter: str):
+        """Show the letter jumped to in the middle of the screen."""
+        size = 60
+        center_x, center_y = self.screen_width / 2, self.screen_height / 2
+        self.draw_rectangle_r(
+            [
+                center_x - size / 2,
+                center_y - size / 2,
+                center_x + size / 2,
+                center_y + size / 2,
+            ],
+            5,
+            fill=color_menu_bg,
+            outline=color_btn_a if self.layout_name == "nintendo" else color_btn_b,
+        )
+        self.draw_text((center_x, center_y), letter, size="lg", anchor="mm")
+
+    def draw_search_keyboard(
+        self,
+        query: str,
+        n_results: int,
+        rows: tuple[tuple[str, ...], ...],
+        selected_row: int,
+        selected_col: int,
+        fill: Optional[str] = None,
+    ):
+        """Draw the search query and an on-screen keyboard over the list."""
+        if fill is None:
+            fill = color_btn_a if self.layout_name == "nintendo" else color_btn_b
+        key_width = 54
+        key_height = 30
+        gap = 4
+        left = 32
+        top = 292
+
+        self.draw_rectangle_r(
+            [20, 258, self.screen_width - 20, 432], 5, fill=color_menu_bg, outline=fill
+        )
+        self.draw_text((left, 265), f"Search: {query}_ ({n_results} found)")
+
+        def draw_keys():
+            for i, row in enumerate(rows):
+                for j, key in enumerate(row):
+                    x = left + j * (key_width + gap)
+                    y = top + i * (key_height + gap)
+                    self.draw_rectangle_r(
+                        [x, y, x + key_width, y + key_height],
+                        5,
+                        fill=(
+                            fill
+                            if (i, j) == (selected_row, selected_col)
+                            else color_row_bg
+                        ),
+                    )
+                    self.draw_text(
+                        (x + key_width / 2, y + key_height / 2),
+                        key,
+                        size="sm" if len(key) > 1 else "md",
+                        anchor="mm",
+                    )
+
+        # Only the selected key changes while moving around the keyboard
+        self.draw_layer(
+            ("search_keyboard", rows, selected_row, selected_col, fill),
+            (
+                left,
+                top,
+                left + 10 * (key_width + gap),
+                top + len(rows) * (key_height + gap),
+            ),
+            draw_keys,
+            background=color_menu_bg,
+        )
+
+    def draw_frame_stats(self, lines: list[str]):
+        """Overlay the frame timings in the bottom right corner."""
+        for i, line in enumerate(lines):
+            self.draw_text(
+                (self.screen_width - 10, self.screen_height - 60 + i * 14),
+                line,
+                size="sm",
+                anchor="ra",
             )
 
+    def _draw_list_header_box(self):
+        self.draw_layer(
+            "list_header_box",
+            (10, 50, self.screen_width - 9, 101),
+            lambda: self.draw_rectangle_r(
+                [10, 50, self.screen_width - 10, 100], 5, outline=color_menu_bg
+            ),
+        )
+
+    def _draw_list_background(self):
+        self.draw_layer(
+            "list_background",
+            (10, 70, self.screen_width - 9, self.screen_height - 42),
+            lambda: self.draw_rectangle_r(
+                [10, 70, self.screen_width - 10, self.screen_height - 43],
+                0,
+                fill=color_menu_bg,
+                outline=None,
+            ),
+        )
+
     def draw_platforms_list(
         self,
         platforms_selected_position: int,
@@ -413,20 +842,13 @@ class UserInterface:
         if fill is None:
             fill = color_btn_a if self.layout_name == "nintendo" else color_btn_b
 
-        self.draw_rectangle_r(
-            [10, 50, self.screen_width - 10, 100], 5, outline=color_menu_bg
-        )
+        self._draw_list_header_box()
         self.draw_text(
             (self.screen_width / 2, 62),
             "Platforms",
             anchor="mm",
         )
-        self.draw_rectangle_r(
-            [10, 70, self.screen_width - 10, self.screen_height - 43],
-            0,
-            fill=color_menu_bg,
-            outline=None,
-        )
+        self._draw_list_background()
 
         start_idx = int(platforms_selected_position / max_n_platforms) * max_n_platforms
         end_idx = start_idx + max_n_platforms
@@ -458,20 +880,13 @@ class UserInterface:
         if fill is None:
             fill = color_btn_b if self.layout_name == "nintendo" else color_btn_a
 
-        self.draw_rectangle_r(
-            [10, 50, self.screen_width - 10, 100], 5, outline=color_menu_bg
-        )
+        self._draw_list_header_box()
         self.draw_text(
             (self.screen_width / 2, 62),
             "Collections",
             anchor="mm",
         )
-        self.draw_rectangle_r(
-            [10, 70, self.screen_width - 10, self.screen_height - 43],
-            0,
-            fill=color_menu_bg,
-            outline=None,
-        )
+        self._draw_list_background()
 
         start_idx = (
             int(collections_selected_position / max_n_collections) * max_n_collections
@@ -480,24 +895,13 @@ class UserInterface:
         max_len_text = 60
         for i, c in enumerate(collections[start_idx:end_idx]):
             is_selected = i == (collections_selected_position % max_n_collections)
-            row_text = c.name
-
-            if len(row_text) > max_len_text:
-                row_text = row_text + " "  # Add empty space for the rotation
-
-            # Calculate shift offset based on time
-            shift_offset = (int(time.time() * 2)) % len(row_text)
-            # Shift text
-            row_text = (
-                row_text[shift_offset:] + row_text[:shift_offset]
-                if len(row_text) > max_len_text
-                else row_text
-            )
-            row_text = (
-                f"{row_text} ({c.rom_count})"
-                if len(row_text) <= max_len_text
-                else row_text[:max_len_text] + f" ({c.rom_count})"
-            )
+            if len(c.name) > max_len_text:
+                # Add empty space for the rotation
+                row_text = ""
+                marquee = ("", c.name + " ", f" ({c.rom_count})", max_len_text)
+            else:
+                row_text = f"{c.name} ({c.rom_count})"
+                marquee = None
 
             self.row_list(
                 row_text,
@@ -506,8 +910,52 @@ class UserInterface:
                 32,
                 is_selected,
                 fill=fill,
+                marquee=marquee,
             )
 
+    def _rom_row_text(
+        self,
+        rom: Rom,
+        max_len_text: int,
+        is_multi_selected: bool,
+        is_in_device: bool,
+    ) -> str | tuple[str, str, str]:
+        """Return the cached row text of a ROM.
+
+        Short rows are returned as the final string. Rows that scroll are
+        returned as (prefix, scrolling text, suffix) so only the marquee
+        offset has to be applied per frame.
+        """
+        key = (rom.id, rom.name, max_len_text, is_multi_selected, is_in_device)
+        row_text = self._rom_rows_cache.get(key)
+        if row_text is not None:
+            return row_text
+
+        # Build base row text
+        base_text = rom.name
+        base_text += f" ({','.join(rom.languages)})" if rom.languages else ""
+        base_text += f" ({','.join(rom.regions)})" if rom.regions else ""
+        base_text += f" ({','.join(rom.revision)})" if rom.revision else ""
+        base_text += f" ({','.join(rom.tags)})" if rom.tags else ""
+
+        # Checkbox before the text, file size and sync flag after it
+        sync_flag_text = f"{glyphs.cloud_sync}" if is_in_device else ""
+        prefix = (
+            f"{glyphs.checkbox_selected if is_multi_selected else glyphs.checkbox} "
+        )
+        suffix = f" [{rom.fs_size[0]}{rom.fs_size[1]}] {sync_flag_text}"
+
+        if len(base_text) > max_len_text:
+            # Add empty space for the rotation
+            row_text = (prefix, base_text + " ", suffix)
+        else:
+            row_text = f"{prefix}{base_text}{suffix}"
+
+        if len(self._rom_rows_cache) >= self.rom_rows_cache_size:
+            self._rom_rows_cache.clear()
+        self._rom_rows_cache[key] = row_text
+        return row_text
+
     def draw_roms_list(
         self,
         roms_selected_position: int,
@@ -518,21 +966,14 @@ class UserInterface:
         multi_selected_roms: list[Rom],
         prepend_platform_slug: bool = False,
     ):
-        self.draw_rectangle_r(
-            [10, 50, self.screen_width - 10, 100], 5, outline=color_menu_bg
-        )
+        self._draw_list_header_box()
         self.draw_text(
             (self.screen_width / 2, 62),
             header_text,
             color=header_color,
             anchor="mm",
         )
-        self.draw_rectangle_r(
-            [10, 70, self.screen_width - 10, self.screen_height - 43],
-            0,
-            fill=color_menu_bg,
-            outline=None,
-        )
+        self._draw_list_background()
 
         # Adjust max text length to reserve space for file size and padding
         padding = 4  # Additional padding in characters
@@ -546,30 +987,16 @@ class UserInterface:
         end_idx = min(start_idx + max_n_roms, len(roms))
         for i, r in enumerate(roms[start_idx:end_idx]):
             is_selected = i == (roms_selected_position % max_n_roms)
-            is_in_device = self.fs.is_rom_in_device(r)
-            sync_flag_text = f"{glyphs.cloud_sync}" if is_in_device else ""
-
-            # Build base row text
-            row_text = r.name
-            row_text += f" ({','.join(r.languages)})" if r.languages else ""
-            row_text += f" ({','.join(r.regions)})" if r.regions else ""
-            row_text += f" ({','.join(r.revision)})" if r.revision else ""
-            row_text += f" ({','.join(r.tags)})" if r.tags else ""
-
-            # Handle text scrolling
-            if len(row_text) > max_len_text:
-                row_text = row_text + " "
-                shift_offset = (int(time.time() * 2)) % len(row_text)
-                row_text = row_text[shift_offset:] + row_text[:shift_offset]
-
-            # Truncate base text and append file size with padding
-            size_text = f"[{r.fs_size[0]}{r.fs_size[1]}] {sync_flag_text}"
-            if len(row_text) > max_len_text:
-                row_text = row_text[:max_len_text]
-            row_text = f"{row_text} {size_text}"
-
-            # Add checkbox
-            row_text = f"{glyphs.checkbox_selected if r in multi_selected_roms else glyphs.checkbox} {row_text}"
+            is_multi_selected = r in multi_selected_roms
+            row_text = self._rom_row_text(
+                r, max_len_text, is_multi_selected, self.fs.is_rom_in_device(r)
+            )
+
+            # Long names scroll over a row drawn without text
+            marquee = None
+            if not isinstance(row_text, str):
+                marquee = (*row_text, max_len_text)
+                row_text = ""
 
             self.row_list(
                 row_text,
@@ -578,12 +1005,13 @@ class UserInterface:
                 32,
                 is_selected,
                 fill=header_color,
-                outline=header_color if r in multi_selected_roms else None,
+                outline=header_color if is_multi_selected else None,
                 append_icon_path=(
                     f"{self.fs.resources_path}/{r.platform_slug}.ico"
                     if prepend_platform_slug
                     else ""
                 ),
+                marquee=marquee,
             )
 
     def draw_menu_background(
@@ -1,26 +1,44 @@
+import hashlib
+import json
 import os
 import re
+import threading
+import time
 from urllib.error import HTTPError, URLError
 from urllib.request import Request, urlopen
 
-import sdl2
+from config import getenv_number
 from filesystem import Filesystem
-from glyps import glyphs
 from semver import Version
 from status import Status
-from ui import UserInterface
 
 
 class Update:
     github_repo = "rommapp/muos-app"
+    # Bytes read from the connection at once while downloading an update
+    download_chunk_size = 256 * 1024
 
-    def __init__(self, ui: UserInterface) -> None:
-        self.ui = ui
+    def __init__(self) -> None:
         self.status = Status()
         self.filesystem = Filesystem()
-        self.current_version = self.get_current_version()
+        self._current_version: str | None = None
         self.download_percent = 0.0
         self.total_size = 0
+        # None while no download finished, then whether the last one succeeded
+        self.download_result: bool | None = None
+        self._download_thread: threading.Thread | None = None
+        # The latest release is asked to GitHub at most every UPDATE_CHECK_HOURS
+        self.release_cache_path = os.getenv(
+            "RELEASE_CACHE_PATH", os.path.join(os.getcwd(), "cache", "release.json")
+        )
+        self.release_cache_ttl = getenv_number("UPDATE_CHECK_HOURS", 24) * 3600
+
+    @property
+    def current_version(self) -> str:
+        # Only the update check needs it, read when it runs
+        if self._current_version is None:
+            self._current_version = self.get_current_version()
+        return self._current_version
 
     def get_current_version(self) -> str:
         """Read the version from __version__.py in the current directory."""
@@ -45,53 +63,164 @@ class Update:
         return v1 < v2
 
     def get_latest_release_info(self) -> dict | None:
+        """The latest release, from the release cache while it is fresh.
+
+        Once it is older than release_cache_ttl it is revalidated with its
+        ETag, which doesn't count against the GitHub rate limit when the
+        release didn't change.
+        """
+        cached = self._load_release_cache()
+        if cached and time.time() - cached["checked"] < self.release_cache_ttl:
+            print("Latest release checked recently, using the cached one")
+            return cached["release"]
+
         url = f"https://api.github.com/repos/{self.github_repo}/releases/latest"
+        headers = {"Accept": "application/vnd.github.v3+json"}
+        if cached and cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
         try:
-            request = Request(url, headers={"Accept": "application/vnd.github.v3+json"})
+            request = Request(url, headers=headers)
             with urlopen(request, timeout=5) as response:  # trunk-ignore(bandit/B310)
-                data = response.read().decode("utf-8")
-                import json
-
-                return json.loads(data)
-        except (HTTPError, URLError) as e:
+                release = json.loads(response.read().decode("utf-8"))
+                etag = response.getheader("ETag")
+        except HTTPError as e:
+            if e.code == 304 and cached:
+                self._save_release_cache(cached["release"], cached.get("etag"))
+                return cached["release"]
             print(f"Failed to fetch latest release info: {e}")
             return None
+        except (URLError, OSError, ValueError) as e:
+            print(f"Failed to fetch latest release info: {e}")
+            return None
+
+        # Only what the update check and download use is kept
+        release = {
+            "tag_name": release.get("tag_name", ""),
+            "assets": [
+                {
+                    key: asset[key]
+                    for key in ("name", "browser_download_url", "size", "digest")
+                    if key in asset
+                }
+                for asset in release.get("assets", [])
+            ],
+        }
+        self._save_release_cache(release, etag)
+        return release
 
-    def download_update(self, url) -> bool:
+    def _load_release_cache(self) -> dict | None:
+        try:
+            with open(self.release_cache_path) as f:
+                cached = json.load(f)
+            return cached if "release" in cached and "checked" in cached else None
+        except (OSError, ValueError):
+            return None
+
+    def _save_release_cache(self, release: dict, etag: str | None) -> None:
+        try:
+            os.makedirs(os.path.dirname(self.release_cache_path), exist_ok=True)
+            with open(f"{self.release_cache_path}.tmp", "w") as f:
+                json.dump({"release": release, "etag": etag, "checked": time.time()}, f)
+            os.replace(f"{self.release_cache_path}.tmp", self.release_cache_path)
+        except OSError as e:
+            print(f"Error saving release cache: {e}")
+
+    def start_download(self, asset: dict) -> None:
+        """Download a release asset on a worker thread, see download_update."""
+        self.download_result = None
+        self.download_percent = 0.0
+        self._download_thread = threading.Thread(
+            target=self.download_update, args=(asset,), daemon=True
+        )
+        self._download_thread.start()
+
+    @property
+    def downloading(self) -> bool:
+        return self._download_thread is not None and self._download_thread.is_alive()
+
+    def download_update(self, asset: dict) -> bool:
+        """Download a release asset next to main.py for apply_pending_update.
+
+        The file is written to a .part file first, resumed with a Range
+        request if a previous download was interrupted, and only renamed to
+        its final name once its size and digest match the ones GitHub
+        published for the asset. Progress is kept in download_percent for
+        the main loop to draw.
+        """
+        url = asset["browser_download_url"]
         update_filename = os.path.basename(url)
+        part_filename = f"{update_filename}.part"
+        expected_size = asset.get("size") or 0
+        start = time.perf_counter()
+
+        try:
+            downloaded_bytes = os.path.getsize(part_filename)
+        except OSError:
+            downloaded_bytes = 0
+        if expected_size and downloaded_bytes >= expected_size:
+            # Complete or not the file we expect, can't resume from it
+            downloaded_bytes = 0
+
         try:
             request = Request(url)
-            with urlopen(request) as response:  # trunk-ignore(bandit/B310)
-                self.total_size = int(response.getheader("Content-Length", 0)) or 1
-                self.download_percent = 0.0
-                downloaded_bytes = 0
-                chunk_size = 1024
-
-                with open(update_filename, "wb") as out_file:
-                    while True:
-                        chunk = response.read(chunk_size)
-                        if not chunk:
-                            break
-                        out_file.write(chunk)
+            if downloaded_bytes:
+                request.add_header("Range", f"bytes={downloaded_bytes}-")
+            with urlopen(request, timeout=30) as response:  # trunk-ignore(bandit/B310)
+                if response.status != 206:
+                    # The server sent the whole file
+                    downloaded_bytes = 0
+                else:
+                    print(f"Resuming update download at {downloaded_bytes} bytes")
+                resumed_bytes = downloaded_bytes
+                self.total_size = (
+                    expected_size
+                    or downloaded_bytes + int(response.getheader("Content-Length", 0))
+                    or 1
+                )
+
+                with open(part_filename, "ab" if downloaded_bytes else "wb") as f:
+                    while chunk := response.read(self.download_chunk_size):
+                        f.write(chunk)
                         downloaded_bytes += len(chunk)
                         self.download_percent = min(
-                            100.0, (downloaded_bytes / self.total_size) * 100
-                        )
-                        self.ui.draw_loader(self.download_percent)
-                        self.ui.draw_log(
-                            text_line_1="Downloading update...",
-                            text_line_2=f"{self.download_percent:.2f} / 100 % | ( {glyphs.download} {update_filename})",
-                            background=True,
+                            100.0, downloaded_bytes / self.total_size * 100
                         )
-                        self.ui.render_to_screen()
-                        sdl2.SDL_Delay(16)
 
-                self.status.updating.clear()
-                return True
+            seconds = time.perf_counter() - start
+            print(
+                f"Update downloaded: {(downloaded_bytes - resumed_bytes) / 1024:.0f}KB "
+                f"in {seconds:.1f}s, "
+                f"{(downloaded_bytes - resumed_bytes) / 1024 / max(seconds, 0.001):.0f}KB/s"
+            )
+            if not self._verify_download(part_filename, asset):
+                os.remove(part_filename)
+                self.download_result = False
+                return False
+            os.replace(part_filename, update_filename)
+            self.download_result = True
+            return True
 
-        except (HTTPError, URLError) as e:
+        except (HTTPError, URLError, OSError, ValueError) as e:
+            # The .part file is kept, the next download resumes from it
             print(f"Update download failed: {e}")
-            self.status.updating.clear()
-            if os.path.exists(update_filename):
-                os.remove(update_filename)
+            self.download_result = False
+            return False
+
+    def _verify_download(self, filename: str, asset: dict) -> bool:
+        size = os.path.getsize(filename)
+        if asset.get("size") and size != asset["size"]:
+            print(f"Update size mismatch: got {size} bytes, expected {asset['size']}")
+            return False
+
+        # Digests are published as "sha256:<hex>", older assets have none
+        algorithm, _, expected = (asset.get("digest") or "").partition(":")
+        if not expected or algorithm not in hashlib.algorithms_available:
+            return True
+        digest = hashlib.new(algorithm)
+        with open(filename, "rb") as f:
+            while chunk := f.read(self.download_chunk_size):
+                digest.update(chunk)
+        if digest.hexdigest() != expected.lower():
+            print(f"Update {algorithm} mismatch: got {digest.hexdigest()}")
             return False
+        return True
@@ -0,0 +1,149 @@
+import json
+import os
+import shutil
+import time
+import zipfile
+import zlib
+
+
+class UpdateInstaller:
+    """Installs a .muxapp archive over the app, writing only the files that changed.
+
+    The central directory of the archive is the manifest: it lists the size
+    and CRC32 of every file. An installed file is left alone when it already
+    has them, which is known without reading it back when its size and
+    mtime are the ones recorded by the previous install, and otherwise by
+    hashing it.
+
+    Changed files are extracted to a staging folder next to the app, where
+    zipfile checks their CRC32, then a journal listing them is written and
+    they are moved into place one by one. An install stopped before the
+    journal is written leaves the app untouched and is started over, one
+    stopped after is finished by the next resume().
+    """
+
+    # Bytes copied at once between the archive and the files
+    chunk_size = 1024 * 1024
+    # Moved into place last, so until the install is done main.py and this
+    # file are from a version that can finish it
+    last_files = ("RomM/update_installer.py", "RomM/main.py")
+
+    def __init__(self, install_path: str) -> None:
+        # Folder the archive is extracted to, with the RomM folder inside
+        self.install_path = os.path.abspath(install_path)
+        self.staging_path = os.path.join(self.install_path, ".RomM-update")
+        self.journal_path = os.path.join(self.staging_path, "journal.json")
+        self.manifest_path = os.path.join(self.install_path, "RomM", ".installed.json")
+
+    def resume(self) -> None:
+        """Finish an install stopped while moving files, or drop a partial one."""
+        if os.path.exists(self.journal_path):
+            print("Finishing interrupted update")
+            self._commit()
+        elif os.path.exists(self.staging_path):
+            shutil.rmtree(self.staging_path)
+
+    def install(self, archive_path: str) -> None:
+        start = time.perf_counter()
+        self.resume()
+        installed = self._load_manifest()
+
+        with zipfile.ZipFile(archive_path, "r") as zip_ref:
+            files = [info for info in zip_ref.infolist() if not info.is_dir()]
+            changed = sorted(
+                (
+                    info
+                    for info in files
+                    if not self._is_installed(info, installed.get(info.filename))
+                ),
+                key=self._commit_order,
+            )
+
+            os.makedirs(self.staging_path)
+            journal = []
+            written_bytes = 0
+            for i, info in enumerate(changed):
+                staged_path = os.path.join(self.staging_path, str(i))
+                # Reading the entry to the end raises BadZipFile on a CRC mismatch
+                with zip_ref.open(info) as source, open(staged_path, "wb") as target:
+                    shutil.copyfileobj(source, target, self.chunk_size)
+                    os.fsync(target.fileno())
+                journal.append((staged_path, self._target_path(info.filename)))
+                written_bytes += info.file_size
+            extract_seconds = time.perf_counter() - start
+
+        # From here on the install is finished even if it is interrupted
+        with open(f"{self.journal_path}.tmp", "w") as f:
+            json.dump(journal, f)
+            os.fsync(f.fileno())
+        os.replace(f"{self.journal_path}.tmp", self.journal_path)
+        self._commit()
+        self._save_manifest(files)
+
+        print(
+            f"Update installed in {time.perf_counter() - start:.1f}s: "
+            f"{len(changed)} of {len(files)} files changed, "
+            f"{written_bytes / 1024:.0f}KB written, "
+            f"{extract_seconds:.1f}s checking and extracting"
+        )
+
+    def _commit_order(self, info: zipfile.ZipInfo) -> int:
+        if info.filename in self.last_files:
+            return 1 + self.last_files.index(info.filename)
+        return 0
+
+    def _target_path(self, name: str) -> str:
+        path = os.path.abspath(os.path.join(self.install_path, name))
+        # Like extractall, never write outside of the install folder
+        if os.path.commonpath((path, self.install_path)) != self.install_path:
+            raise ValueError(f"Archive entry outside of the app folder: {name}")
+        return path
+
+    def _is_installed(self, info: zipfile.ZipInfo, recorded: list | None) -> bool:
+        try:
+            stat = os.stat(self._target_path(info.filename))
+        except OSError:
+            return False
+        if stat.st_size != info.file_size:
+            return False
+        # Not modified since the install that recorded its CRC
+        if recorded == [info.file_size, info.CRC, stat.st_mtime_ns]:
+            return True
+        return self._crc32(self._target_path(info.filename)) == info.CRC
+
+    def _crc32(self, path: str) -> int:
+        crc = 0
+        with open(path, "rb") as f:
+            while chunk := f.read(self.chunk_size):
+                crc = zlib.crc32(chunk, crc)
+        return crc
+
+    def _commit(self) -> None:
+        with open(self.journal_path) as f:
+            journal = json.load(f)
+        # Files already moved by an interrupted commit are no longer staged
+        for staged_path, target_path in journal:
+            if os.path.exists(staged_path):
+                os.makedirs(os.path.dirname(target_path), exist_ok=True)
+                os.replace(staged_path, target_path)
+        shutil.rmtree(self.staging_path)
+
+    def _load_manifest(self) -> dict[str, list]:
+        try:
+            with open(self.manifest_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_manifest(self, files: list[zipfile.ZipInfo]) -> None:
+        manifest = {}
+        for info in files:
+            try:
+                mtime = os.stat(self._target_path(info.filename)).st_mtime_ns
+            except OSError:
+                continue
+            manifest[info.filename] = [info.file_size, info.CRC, mtime]
+        os.makedirs(os.path.dirname(self.manifest_path), exist_ok=True)
+        with open(f"{self.manifest_path}.tmp", "w") as f:
+            json.dump(manifest, f)
+        os.replace(f"{self.manifest_path}.tmp", self.manifest_path)
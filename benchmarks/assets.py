@@ -0,0 +1,107 @@
+"""Compare the time and peak memory of decoding cover art at full size then
+resizing it, against decoding at a reduced scale, for each resampling filter.
+
+Usage: python benchmarks/assets.py [image ...]
+Without images, synthetic covers and screenshots are generated.
+"""
+
+import os
+import resource
+import statistics
+import sys
+import tempfile
+import time
+from io import BytesIO
+from multiprocessing import get_context
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "RomM"))
+
+from imageutils import RESAMPLE_FILTERS, ImageUtils  # noqa: E402
+from PIL import Image  # noqa: E402
+
+RUNS = 5
+
+
+def full_decode(data: bytes, size: tuple[int, int], fit: bool) -> Image.Image:
+    """Decoding path before reduced-size decoding: full RGBA image, then resize."""
+    image = Image.open(BytesIO(data)).convert("RGBA")
+    if fit:
+        scale = min(size[0] / image.width, size[1] / image.height)
+        size = (int(image.width * scale), int(image.height * scale))
+    return image.resize(size)
+
+
+def reduced_decode(
+    data: bytes, size: tuple[int, int], fit: bool, resample: str
+) -> Image.Image:
+    image_utils = ImageUtils()
+    image_utils.resample = RESAMPLE_FILTERS[resample]
+    image = image_utils.decode_image(data, size, fit=fit)
+    assert image is not None
+    return image
+
+
+def measure(variant: str, data: bytes, size: tuple[int, int], fit: bool):
+    """Run in a child process so the peak RSS only counts this variant."""
+    decode = (
+        (lambda: full_decode(data, size, fit))
+        if variant == "full"
+        else (lambda: reduced_decode(data, size, fit, variant))
+    )
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    times = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        decode()
+        times.append((time.perf_counter() - start) * 1000)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_before
+    return statistics.median(times), peak / 1024
+
+
+def synthetic_assets(directory: str) -> list[str]:
+    paths = []
+    for name, size, fmt in (
+        ("cover.jpg", (1200, 1600), "JPEG"),
+        ("cover_large.jpg", (2400, 3200), "JPEG"),
+        ("cover.png", (1200, 1600), "PNG"),
+        ("screenshot.png", (1280, 960), "PNG"),
+        ("screenshot.jpg", (1920, 1080), "JPEG"),
+    ):
+        path = os.path.join(directory, name)
+        Image.effect_noise(size, 40).convert("RGB").save(path, fmt)
+        paths.append(path)
+    return paths
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        paths = sys.argv[1:] or synthetic_assets(directory)
+        context = get_context("fork")
+        image_utils = ImageUtils()
+        variants = ["full", *RESAMPLE_FILTERS]
+
+        print(f"{'asset':<28} {'size':>11} " + " ".join(f"{v:>17}" for v in variants))
+        for path in paths:
+            with open(path, "rb") as f:
+                data = f.read()
+            with Image.open(BytesIO(data)) as image:
+                dimensions = f"{image.width}x{image.height}"
+            if "screenshot" in os.path.basename(path):
+                size, fit = (image_utils.screen_width, image_utils.screen_height), False
+            else:
+                size = (image_utils.max_cover_width, image_utils.max_cover_height)
+                fit = True
+
+            results = []
+            for variant in variants:
+                with context.Pool(1) as pool:
+                    ms, peak_mb = pool.apply(measure, (variant, data, size, fit))
+                results.append(f"{ms:7.1f}ms {peak_mb:5.1f}MB")
+            print(
+                f"{os.path.basename(path):<28} {dimensions:>11} "
+                + " ".join(f"{r:>17}" for r in results)
+            )
+
+
+if __name__ == "__main__":
+    main()
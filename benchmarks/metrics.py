@@ -0,0 +1,50 @@
+"""Compare the metrics files written with METRICS_FILE by app version.
+
+Usage: python benchmarks/metrics.py metrics.jsonl [metrics.jsonl ...]
+Files copied from several devices can be given at once, the rollups of
+each version are merged.
+"""
+
+import json
+import sys
+from collections import defaultdict
+
+
+def main(paths: list[str]) -> None:
+    # (version, name) -> merged rollup
+    merged: dict[tuple[str, str], dict] = defaultdict(
+        lambda: {"count": 0, "total": 0.0, "p95": 0.0, "max": 0.0}
+    )
+    for path in paths:
+        with open(path) as f:
+            for line in f:
+                rollup = json.loads(line)
+                entry = merged[(rollup["version"], rollup["name"])]
+                entry["count"] += rollup.get("count", 0)
+                entry["total"] += rollup["total"]
+                # Worst rollup, percentiles of different rollups don't add up
+                entry["p95"] = max(entry["p95"], rollup.get("p95", 0.0))
+                entry["max"] = max(entry["max"], rollup.get("max", 0.0))
+
+    print(
+        f"{'version':<12} {'name':<32} {'count':>8} {'mean':>10} {'p95':>10} {'max':>10} {'total':>12}"
+    )
+    for (version, name), entry in sorted(
+        merged.items(), key=lambda i: (i[0][1], i[0][0])
+    ):
+        if entry["count"]:
+            mean = f"{entry['total'] / entry['count']:.2f}"
+            print(
+                f"{version:<12} {name:<32} {entry['count']:>8} {mean:>10} "
+                f"{entry['p95']:>10.2f} {entry['max']:>10.2f} {entry['total']:>12.1f}"
+            )
+        else:
+            print(
+                f"{version:<12} {name:<32} {'':>8} {'':>10} {'':>10} {'':>10} {entry['total']:>12.0f}"
+            )
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        sys.exit(__doc__)
+    main(sys.argv[1:])
@@ -0,0 +1,131 @@
+"""Compare the memory retained by a ROM list stored as the plain namedtuples
+fetch_roms built before, as compact Rom records, and as a RomTable.
+
+Usage: python benchmarks/roms.py [count]
+The api/roms items are synthetic, with repeated platforms, extensions and
+metadata labels like a real library. Defaults to 10000 ROMs.
+"""
+
+import gc
+import math
+import os
+import random
+import sys
+import tracemalloc
+from collections import namedtuple
+from typing import Any, Callable
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "RomM"))
+
+from models import Rom  # noqa: E402
+from rom_table import RomTable  # noqa: E402
+
+# Rom before compact records: stored fs_size, list fields
+OldRom = namedtuple("OldRom", ["fs_size", *Rom._fields])
+
+
+def old_human_readable_size(size_bytes: int) -> tuple[float, str]:
+    if size_bytes == 0:
+        return 0, "B"
+    i = int(math.floor(math.log(size_bytes, 1024)))
+    return round(size_bytes / math.pow(1024, i), 2), ("B", "KB", "MB", "GB")[i]
+
+
+def old_rom(rom: dict[str, Any]) -> OldRom:
+    """fetch_roms before compact records: stored fs_size, lists and no interning."""
+    metadatum = rom.get("metadatum", {})
+    fields = {field: rom.get(field) for field in Rom._fields}
+    for field in ("regions", "languages", "tags", "merged_screenshots"):
+        fields[field] = list(rom.get(field, []))
+    for field in (
+        "genres",
+        "franchises",
+        "collections",
+        "companies",
+        "game_modes",
+        "age_ratings",
+    ):
+        fields[field] = list(metadatum.get(field, []))
+    fields["first_release_date"] = metadatum.get("first_release_date")
+    fields["average_rating"] = metadatum.get("average_rating")
+    return OldRom(fs_size=old_human_readable_size(rom["fs_size_bytes"]), **fields)
+
+
+def synthetic_items(count: int) -> list[dict[str, Any]]:
+    rng = random.Random(0)
+    platforms = [f"platform-{i}" for i in range(30)]
+    labels = [f"label {i}" for i in range(200)]
+    items = []
+    for i in range(count):
+        name = f"Game {i} ({rng.choice(['USA', 'Europe', 'Japan'])})"
+        # Strings built per item, like json.loads does
+        items.append(
+            {
+                "id": i,
+                "platform_id": i % 30,
+                "platform_slug": "".join(rng.choice(platforms)),
+                "fs_name": f"{name}.zip",
+                "fs_name_no_tags": f"Game {i}",
+                "fs_name_no_ext": name,
+                "fs_extension": "".join("zip"),
+                "fs_size_bytes": rng.randint(1, 1 << 30),
+                "name": f"Game {i}",
+                "slug": f"game-{i}",
+                "summary": f"Summary of game {i}. " * 5,
+                "path_cover_small": f"/assets/covers/{i}/small.png",
+                "path_cover_large": f"/assets/covers/{i}/large.png",
+                "is_identified": True,
+                "revision": "".join(rng.choice(["", "Rev 1", "Rev 2"])),
+                "regions": ["".join(rng.choice(["USA", "Europe", "Japan"]))],
+                "languages": ["".join("En")],
+                "tags": [],
+                "merged_screenshots": [f"/assets/screenshots/{i}/0.png"],
+                "metadatum": {
+                    field: ["".join(rng.choice(labels)) for _ in range(2)]
+                    for field in (
+                        "genres",
+                        "franchises",
+                        "collections",
+                        "companies",
+                        "game_modes",
+                        "age_ratings",
+                    )
+                },
+            }
+        )
+    return items
+
+
+def retained(build: Callable[[list[dict[str, Any]]], Any], count: int) -> float:
+    """MB still allocated by the built list once the payload is freed."""
+    # Traced from the payload on, the strings kept from it are counted
+    tracemalloc.start()
+    items = synthetic_items(count)
+    roms = build(items)
+    del items
+    gc.collect()
+    current, _peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del roms
+    return current / 1024 / 1024
+
+
+def build_table(items: list[dict[str, Any]]) -> RomTable:
+    table = RomTable.from_payload(items)
+    list(table)  # Decode every row
+    return table
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    print(f"Memory retained by {count} ROMs (tracemalloc)")
+    for label, build in (
+        ("namedtuples (before)", lambda items: [old_rom(rom) for rom in items]),
+        ("Rom records", lambda items: [Rom.from_api(rom) for rom in items]),
+        ("RomTable", build_table),
+    ):
+        print(f"  {label:<22} {retained(build, count):7.1f}MB")
+
+
+if __name__ == "__main__":
+    main()